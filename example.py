@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import time
+from functools import cache
 from pathlib import Path
 from typing import TYPE_CHECKING
 
@@ -12,9 +13,16 @@ if TYPE_CHECKING:
     from matplotlib.axes import Axes
     from matplotlib.figure import Figure, SubFigure
 
+# the plotted data does not change between renders, so it is computed only once
+SINE_X = np.linspace(0, 10, 100)
+SINE_Y = np.sin(SINE_X)
+# same values as two consecutive `random(20)` calls of a generator seeded with 42
+SCATTER_X, SCATTER_Y = np.random.default_rng(seed=42).random((2, 20))
 
+
+@cache
 def add_svg() -> str:
-    """Add a svg logo."""
+    """Add a svg logo. The file is only read once."""
     return (Path(__file__).parent / "example.svg").read_text()
 
 
@@ -22,8 +30,7 @@ def draw_sine(container: Figure | SubFigure) -> Axes:
     """Draw a sine wave."""
     ax = container.subplots()
 
-    x = np.linspace(0, 10, 100)
-    ax.plot(x, np.sin(x), color="#007bff")
+    ax.plot(SINE_X, SINE_Y, color="#007bff")
     ax.set_title("Sine Wave")
 
     return ax
@@ -33,9 +40,7 @@ def draw_scatter(container: Figure | SubFigure) -> Axes:
     """Draw a scatter plot."""
     ax = container.subplots()
 
-    rnd_gen = np.random.default_rng(seed=42)
-
-    ax.scatter(rnd_gen.random(20), rnd_gen.random(20), color="#ff7f0e")
+    ax.scatter(SCATTER_X, SCATTER_Y, color="#ff7f0e")
     ax.set_title("Random Distribution")
 
     return ax
@@ -2,14 +2,15 @@
 
 import matplotlib as mpl
 
+# select the non-interactive backend before any figure is created
+mpl.use("Agg", force=True)
+
 from mpl_grid_configurator.backend import start_app
 from mpl_grid_configurator.merge import merge_paths
 from mpl_grid_configurator.register import register
 from mpl_grid_configurator.render import render_layout, render_recursive, split_figure
 from mpl_grid_configurator.types import Layout, LayoutNode
 
-mpl.use("Agg")
-
 __version__ = "0.4.9"
 
 __all__ = [
@@ -3,32 +3,60 @@
 from __future__ import annotations
 
 import logging
-from copy import deepcopy
-from typing import TYPE_CHECKING, Any, Literal
+from functools import partial
+from typing import TYPE_CHECKING, Any, Literal, NamedTuple
 
 from mpl_grid_configurator.figure_editor import FigureEditor
+from mpl_grid_configurator.hashcons import LayoutInterner
 from mpl_grid_configurator.layout_editor import LayoutEditor
 from mpl_grid_configurator.register import DRAW_FUNCS
-from mpl_grid_configurator.render import DEFAULT_LEAF
-from mpl_grid_configurator.traverse import almost_equal, assert_node, get_at, get_node
+from mpl_grid_configurator.render import DEFAULT_LEAF, DEFAULT_RATIOS, keep_svg
+from mpl_grid_configurator.traverse import (
+    are_ratios_equal,
+    assert_node,
+    clone_layout,
+    get_node,
+)
+from mpl_grid_configurator.types import Change
 
 if TYPE_CHECKING:
     from collections.abc import Callable, MutableMapping, Sequence
 
-    from mpl_grid_configurator.types import Change, DrawFunc, Layout, LayoutNode, LPath, SubFigure_
+    from mpl_grid_configurator.types import DrawFunc, Layout, LayoutNode, LPath, SubFigure_
 
 logger = logging.getLogger(__name__)
 
+# per session and drawing function
+MAX_CACHED_SUBFIGS = 8
+
+
+class SvgCallbacks:
+    """Apply svg callbacks in order.
+
+    Used instead of nesting a closure per edit, which would add a call level each time.
+    """
+
+    def __init__(self, callbacks: tuple[Callable[[str], str], ...]) -> None:
+        """Initialize with the callbacks to apply."""
+        self.callbacks = callbacks
+
+    def __call__(self, svg: str) -> str:
+        """Apply all callbacks."""
+        for callback in self.callbacks:
+            svg = callback(svg)
+        return svg
+
 
 def wrap_svg_callback(
     prev: Callable[[str], str], curr: Callable[[str], str]
 ) -> Callable[[str], str]:
     """Wrap a svg callback to apply a new callback on top of an existing one."""
-
-    def wrapped_svg_callback(value: str) -> str:
-        return curr(prev(value))
-
-    return wrapped_svg_callback
+    if curr is keep_svg:
+        return prev
+    if prev is keep_svg:
+        return curr
+    prev_callbacks = prev.callbacks if isinstance(prev, SvgCallbacks) else (prev,)
+    return SvgCallbacks((*prev_callbacks, curr))
 
 
 def get_drawer(subfigs: MutableMapping[str, list[SubFigure_]], value: str) -> DrawFunc | SubFigure_:
@@ -45,7 +73,11 @@ def add_to_cache(
 ) -> None:
     """Add a removed element recursively to the cache."""
     if isinstance(removed, str):
-        subfigs.setdefault(removed, []).append(sf)
+        cache = subfigs.setdefault(removed, [])
+        # keep the memory of long sessions bounded, further subfigures are dropped, the
+        # editors already detached their axes from the figure, so nothing keeps them alive
+        if len(cache) < MAX_CACHED_SUBFIGS:
+            cache.append(sf)
         return
     child1, child2 = removed["children"]
     sf1, sf2 = sf.subfigs
@@ -92,7 +124,7 @@ def insert_node(
     """Insert a node into a figure."""
     root = FigureEditor.split(root, curr_path, value["orient"])
     ratios = value["ratios"]
-    if not almost_equal(ratios[0] / ratios[1], 1.0):
+    if not are_ratios_equal(ratios, DEFAULT_RATIOS):
         FigureEditor.restructure(root, curr_path, value["ratios"])
     child1, child2 = value["children"]
     for ix, child in enumerate((child1, child2)):
@@ -113,39 +145,139 @@ def insert_node(
 def apply_to_layout(
     layout: Layout,
     changes: Sequence[Change],
+    *,
+    copy: bool = True,
 ) -> tuple[Layout, list[Change], list[Layout | None]]:
-    """Apply a list of changes to a layout. Does not mutate the input."""
-    layout = deepcopy(layout)
+    """Apply a list of changes to a layout.
+
+    Does not mutate the input, unless `copy` is False because the caller owns the layout.
+    Without any changes, the input is returned as is.
+    """
+    if not changes:
+        return layout, [], []
+    if copy:
+        layout = clone_layout(layout)
 
     backward: list[Change] = []
     removed_elems: list[Layout | None] = []
 
-    for key, path, kwargs in changes:
-        removed: Layout | None = None
-        match key:
-            case "delete":
-                layout, inverse, removed = LayoutEditor.delete(layout, path)
-            case "insert":
-                layout, inverse, removed = LayoutEditor.insert(layout, path, **kwargs)
-            case "replace":
-                layout, inverse, removed = LayoutEditor.replace(layout, path, **kwargs)
-            case "restructure":
-                layout, inverse = LayoutEditor.restructure(layout, path, **kwargs)
-            case "rotate":
-                layout, inverse = LayoutEditor.rotate(layout, path)
-            case "split":
-                layout, inverse = LayoutEditor.split(layout, path, **kwargs)
-            case "swap":
-                layout, inverse = LayoutEditor.swap(layout, path, **kwargs)
-            case _:
-                raise ValueError(f"Unknown change type: {key}")
+    for change in changes:
+        layout, inverse, removed = apply_change(layout, change)
         backward.append(inverse)
         removed_elems.append(removed)
 
     return layout, backward[::-1], removed_elems
 
 
-def apply_to_figure(  # noqa: C901,PLR0912
+def _without_removed(
+    edit: Callable[..., tuple[Layout, Change]],
+) -> Callable[..., tuple[Layout, Change, Layout | None]]:
+    """Adapt an editor method that removes nothing to the common signature."""
+
+    def wrapped(layout: Layout, path: LPath, **kwargs: Any) -> tuple[Layout, Change, None]:
+        layout, inverse = edit(layout, path, **kwargs)
+        return layout, inverse, None
+
+    return wrapped
+
+
+# dispatch table, every operation returns the new layout, the inverse and the removed element
+LAYOUT_OPS: dict[str, Callable[..., tuple[Layout, Change, Layout | None]]] = {
+    "delete": LayoutEditor.delete,
+    "insert": LayoutEditor.insert,
+    "replace": LayoutEditor.replace,
+    "restructure": _without_removed(LayoutEditor.restructure),
+    "rotate": _without_removed(LayoutEditor.rotate),
+    "split": _without_removed(LayoutEditor.split),
+    "swap": _without_removed(LayoutEditor.swap),
+}
+
+
+def apply_change(layout: Layout, change: Change) -> tuple[Layout, Change, Layout | None]:
+    """Apply a single change to a layout. Mutates the input.
+
+    Returns:
+        A tuple with the new layout, the inverse change and the removed element (if any).
+    """
+    key, path, kwargs = change
+    op = LAYOUT_OPS.get(key)
+    if op is None:
+        raise ValueError(f"Unknown change type: {key}")
+    return op(layout, path, **kwargs)
+
+
+def _figure_delete(
+    root: SubFigure_,
+    change: Change,
+    removed: Layout | None,
+    subfigs: MutableMapping[str, list[SubFigure_]],
+    svg_callback: Callable[[str], str],
+) -> tuple[SubFigure_, Callable[[str], str]]:
+    if not removed:
+        raise ValueError("Got no corresponding removed element")
+    root, removed_sf = FigureEditor.delete(root, change[1])
+    add_to_cache(removed, removed_sf, subfigs)
+    return root, svg_callback
+
+
+def _figure_insert_or_replace(  # noqa: PLR0913,PLR0917
+    mode: Literal["insert", "replace"],
+    root: SubFigure_,
+    change: Change,
+    removed: Layout | None,
+    subfigs: MutableMapping[str, list[SubFigure_]],
+    svg_callback: Callable[[str], str],
+) -> tuple[SubFigure_, Callable[[str], str]]:
+    if not removed:
+        raise ValueError("Got no corresponding removed element")
+    _, path, kwargs = change
+    value = kwargs.pop("value")
+    if isinstance(value, str):  # simple
+        return insert_or_replace_leaf(
+            mode, root, path, value, kwargs, removed, subfigs, svg_callback
+        )
+    # insert or replace with a dummy leaf first
+    root, svg_callback = insert_or_replace_leaf(
+        mode, root, path, DEFAULT_LEAF, kwargs, removed, subfigs, svg_callback
+    )
+    # and then recursively add subfigures to replace the dummy leaf
+    return insert_node(root, value, path, subfigs, svg_callback)
+
+
+def _figure_edit(
+    edit: Callable[..., SubFigure_ | None],
+) -> Callable[..., tuple[SubFigure_, Callable[[str], str]]]:
+    """Adapt an editor method that only needs the path and the kwargs to the common signature."""
+
+    def wrapped(
+        root: SubFigure_,
+        change: Change,
+        removed: Layout | None,
+        subfigs: MutableMapping[str, list[SubFigure_]],
+        svg_callback: Callable[[str], str],
+    ) -> tuple[SubFigure_, Callable[[str], str]]:
+        del removed, subfigs  # unused
+        _, path, kwargs = change
+        # only split returns a (possibly new) root
+        new_root = edit(root, path, **kwargs)
+        return new_root or root, svg_callback
+
+    return wrapped
+
+
+# dispatch table, every operation returns the new root and svg callback
+FIGURE_OPS: dict[str, Callable[..., tuple[SubFigure_, Callable[[str], str]]]] = {
+    "delete": _figure_delete,
+    "insert": partial(_figure_insert_or_replace, "insert"),
+    "replace": partial(_figure_insert_or_replace, "replace"),
+    "restructure": _figure_edit(FigureEditor.restructure),
+    "rotate": _figure_edit(FigureEditor.rotate),
+    "split": _figure_edit(FigureEditor.split),
+    "swap": _figure_edit(FigureEditor.swap),
+}
+
+
+def apply_to_figure(
     root: SubFigure_,
     changes: Sequence[Change],
     layout_removed: Sequence[Layout | None],
@@ -153,58 +285,48 @@ def apply_to_figure(  # noqa: C901,PLR0912
     svg_callback: Callable[[str], str],
 ) -> tuple[SubFigure_, Callable[[str], str]]:
     """Apply a list of changes to a figure."""
-    for (key, path, kwargs), removed in zip(changes, layout_removed, strict=True):
-        match key:
-            case "delete":
-                if not removed:
-                    raise ValueError("Got no corresponding removed element")
-                root, removed_sf = FigureEditor.delete(root, path)
-                add_to_cache(removed, removed_sf, subfigs)
-            case "insert":
-                if not removed:
-                    raise ValueError("Got no corresponding removed element")
-                value = kwargs.pop("value")
-                if isinstance(value, str):  # simple
-                    root, svg_callback = insert_or_replace_leaf(
-                        "insert", root, path, value, kwargs, removed, subfigs, svg_callback
-                    )
-                    continue
-                # insert dummy leaf first
-                root, svg_callback = insert_or_replace_leaf(
-                    "insert", root, path, DEFAULT_LEAF, kwargs, removed, subfigs, svg_callback
-                )
-                # and then recursively add subfigures to replace the dummy leaf
-                root, svg_callback = insert_node(root, value, path, subfigs, svg_callback)
-            case "replace":
-                if not removed:
-                    raise ValueError("Got no corresponding removed element")
-                value = kwargs.pop("value")
-                if isinstance(value, str):
-                    root, svg_callback = insert_or_replace_leaf(
-                        "replace", root, path, value, kwargs, removed, subfigs, svg_callback
-                    )
-                    continue
-                # replace with dummy leaf first
-                root, svg_callback = insert_or_replace_leaf(
-                    "replace", root, path, DEFAULT_LEAF, kwargs, removed, subfigs, svg_callback
-                )
-                # and then recursively add subfigures to replace the dummy leaf
-                root, svg_callback = insert_node(root, value, path, subfigs, svg_callback)
-            case "restructure":
-                FigureEditor.restructure(root, path, **kwargs)
-            case "rotate":
-                FigureEditor.rotate(root, path)
-            case "split":
-                root = FigureEditor.split(root, path, **kwargs)
-            case "swap":
-                FigureEditor.swap(root, path, **kwargs)
-            case _:
-                raise ValueError(f"Unknown change type: {key}")
+    # check once upfront, so the figure is not left half edited
+    if len(changes) != len(layout_removed):
+        raise ValueError("Got a different number of changes and removed elements")
+    for change, removed in zip(changes, layout_removed, strict=False):
+        op = FIGURE_OPS.get(change[0])
+        if op is None:
+            raise ValueError(f"Unknown change type: {change[0]}")
+        root, svg_callback = op(root, change, removed, subfigs, svg_callback)
 
     return root, svg_callback
 
 
-def rebuild(
+class _Visit(NamedTuple):
+    """Rebuild `elem` at `curr_path` into `target_elem`. `parent` is None for the root."""
+
+    elem: Layout
+    target_elem: Layout
+    curr_path: LPath
+    parent: LayoutNode | None
+
+
+# kwargs of a change which hold a path and have to move with it
+PATH_KWARGS = ("path2",)
+
+
+def rebase_path_kwargs(kwargs: dict[str, Any], depth: int, prefix: LPath) -> dict[str, Any]:
+    """Copy kwargs, replacing the first `depth` indices of path-valued kwargs with `prefix`."""
+    return {
+        key: (*prefix, *value[depth:]) if key in PATH_KWARGS else value
+        for key, value in kwargs.items()
+    }
+
+
+class _Record(NamedTuple):
+    """Memoize the steps since `start` relative to a path of length `depth` under `key`."""
+
+    key: tuple[int, int]
+    start: int
+    depth: int
+
+
+def rebuild(  # noqa: C901,PLR0915
     layout: Layout,
     lca_path: LPath,
     target_layout: Layout,
@@ -214,60 +336,99 @@ def rebuild(
     Does not mutate the input node.
     """
     # possible ideas to optimize this:
-    # * do not just compare leafs, but whole trees if they were swapped somewhere else,
+    # * do not just detect swapped siblings, but also subtrees moved somewhere else,
     # so we do not have to rebuilt them later
 
     forward: list[Change] = []
     backward: list[Change] = []
+    # subtrees are only visited before they are edited, so their numbers stay valid
+    interner = LayoutInterner()
+    # steps relative to the current path for already rebuilt pairs of subtrees
+    memo: dict[tuple[int, int], list[Change]] = {}
 
+    # the layout is copied once below, so the steps can be applied in place
     def add_step(layout: Layout, forward_step: Change) -> Layout:
-        layout, (backward_step,), _ = apply_to_layout(layout, [forward_step])
+        layout, backward_step, _ = apply_change(layout, forward_step)
         forward.append(forward_step)
         backward.append(backward_step)
         return layout
 
-    def recursive_rebuild(
-        layout: Layout, elem: Layout, target_elem: Layout, curr_path: LPath
-    ) -> Layout:
+    layout = clone_layout(layout)
+
+    start_parent = get_node(assert_node(layout), lca_path[:-1]) if lca_path else None
+    start_elem = start_parent["children"][lca_path[-1]] if start_parent else layout
+    start_target = get_node(assert_node(target_layout), lca_path) if lca_path else target_layout
+    interner.intern(start_elem)
+    interner.intern(start_target)
+
+    # depth-first with an explicit stack, the first child is always finished before the second
+    stack: list[_Visit | _Record] = [_Visit(start_elem, start_target, lca_path, start_parent)]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, _Record):
+            memo[item.key] = [
+                Change(step_key, path[item.depth :], rebase_path_kwargs(kwargs, item.depth, ()))
+                for step_key, path, kwargs in forward[item.start :]
+            ]
+            continue
+
+        elem, target_elem, curr_path, parent = item
+        if interner.are_equal(elem, target_elem):
+            # we're finished for this subtree
+            continue
+        if isinstance(elem, str) and isinstance(target_elem, str):
+            # replace elem with new_layout_here
+            layout = add_step(layout, Change("replace", curr_path, {"value": target_elem}))
+            continue
+
+        key = interner.intern(elem), interner.intern(target_elem)
+        if (cached := memo.get(key)) is not None:
+            # the same pair was rebuilt elsewhere, replay its steps under the current path
+            for step_key, rel_path, kwargs in cached:
+                layout = add_step(
+                    layout,
+                    Change(
+                        step_key,
+                        (*curr_path, *rel_path),
+                        rebase_path_kwargs(kwargs, 0, curr_path),
+                    ),
+                )
+            continue
+        stack.append(_Record(key, len(forward), len(curr_path)))
+
+        if isinstance(target_elem, str):
+            # delete child2, child1 takes the place of elem
+            layout = add_step(layout, Change("delete", (*curr_path, 1), {}))
+            # update elem if is not correct yet
+            elem = assert_node(elem)["children"][0]
+            if elem != target_elem:
+                layout = add_step(layout, Change("replace", curr_path, {"value": target_elem}))
+            continue
         if isinstance(elem, str):
-            if isinstance(target_elem, str):
-                if elem == target_elem:
-                    # we're finished for this leaf
-                    return layout
-                # replace elem with new_layout_here
-                return add_step(layout, ("replace", curr_path, {"value": target_elem}))
             # split elem in target direction
-            layout = add_step(layout, ("split", curr_path, {"orient": target_elem["orient"]}))
-            # update elem
-            elem = get_node(assert_node(layout), curr_path)
-        elif isinstance(target_elem, str):
-            # delete child2
-            layout = add_step(layout, ("delete", (*curr_path, 1), {}))
-            # update elem if is not correct yet
-            elem = get_at(layout, curr_path)
-            if elem == target_elem:
-                return layout
-            return add_step(layout, ("replace", curr_path, {"value": target_elem}))
+            layout = add_step(layout, Change("split", curr_path, {"orient": target_elem["orient"]}))
+            # update elem from its parent instead of traversing the path again
+            elem = assert_node(parent["children"][curr_path[-1]] if parent else layout)
         # rotate if necessary
         if elem["orient"] != target_elem["orient"]:
-            layout = add_step(layout, ("rotate", curr_path, {}))
+            layout = add_step(layout, Change("rotate", curr_path, {}))
 
         # adjust the split ratio if necessary
         ratios, target_ratios = elem["ratios"], target_elem["ratios"]
-        if not almost_equal(ratios[0] / ratios[1], target_ratios[0] / target_ratios[1]):
-            layout = add_step(layout, ("restructure", curr_path, {"ratios": target_ratios}))
+        if not are_ratios_equal(ratios, target_ratios):
+            layout = add_step(layout, Change("restructure", curr_path, {"ratios": target_ratios}))
 
         child1, child2 = elem["children"]
         target1, target2 = target_elem["children"]
-
-        layout = recursive_rebuild(layout, child1, target1, (*curr_path, 0))
-        return recursive_rebuild(layout, child2, target2, (*curr_path, 1))
-
-    layout = deepcopy(layout)
-
-    start_elem = get_node(assert_node(layout), lca_path) if lca_path else layout
-    start_target = get_node(assert_node(target_layout), lca_path) if lca_path else target_layout
-
-    layout = recursive_rebuild(layout, start_elem, start_target, lca_path)
+        if (
+            not interner.are_equal(child1, target1)
+            and interner.are_equal(child1, target2)
+            and interner.are_equal(child2, target1)
+        ):
+            # the children were only swapped, a single step instead of rebuilding both
+            layout = add_step(layout, Change("swap", (*curr_path, 0), {"path2": (*curr_path, 1)}))
+            continue
+        stack.append(_Visit(child2, target2, (*curr_path, 1), elem))
+        stack.append(_Visit(child1, target1, (*curr_path, 0), elem))
 
     return layout, forward, backward[::-1]
@@ -12,6 +12,7 @@ import dotenv
 from fastapi import FastAPI
 
 from mpl_grid_configurator.backend.api import EditApi, MainApi
+from mpl_grid_configurator.backend.sessions import FIGURE_POOL
 
 R = TypeVar("R")
 
@@ -30,11 +31,11 @@ FRONTEND_DIR = PARENT / ".." / "frontend"
 
 def start_app(port: int = 8000) -> None:
     """Start the backend and the frontend."""
-    import threading
-    import time
+    import asyncio
 
     import uvicorn
     from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.middleware.gzip import GZipMiddleware
     from servestatic import ServeStaticASGI  # type: ignore[import-untyped]
 
     backend_app = FastAPI()
@@ -46,36 +47,36 @@ def start_app(port: int = 8000) -> None:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    # svgs are large and compress well, a medium level is almost as small but much faster
+    backend_app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=5)
 
     MainApi.add_endpoints(backend_app)
     EditApi.add_endpoints(backend_app)
-
-    # start the backend in a thread
-    backend = threading.Thread(
-        target=uvicorn.run,
-        kwargs={"app": backend_app, "port": 8765},
-        daemon=True,
-    )
-    backend.start()
+    # creating figures is slow, so have some ready for the first sessions
+    FIGURE_POOL.fill()
 
     frontend_app = ServeStaticASGI(None, root=FRONTEND_DIR, index_file="index.html")
 
-    frontend = threading.Thread(
-        target=uvicorn.run,
-        kwargs={"app": frontend_app, "port": port},
-        daemon=True,
-    )
-    frontend.start()
-
-    time.sleep(0.5)  # give the servers time to start
-    print(  # noqa: T201
-        f"To configure your grid, open http://localhost:{port}/index.html in your browser."
-    )
-
-    # allow ctrl-c to stop the servers
-    while True:
-        time.sleep(0.1)
-
-    # wait for the backend thread and the frontend process to finish
-    backend.join()
-    frontend.join()
+    # the frontend expects the backend on its own port, but both servers share one event loop
+    # on the main thread, which also receives ctrl-c
+    backend = uvicorn.Server(uvicorn.Config(backend_app, port=8765))
+    frontend = uvicorn.Server(uvicorn.Config(frontend_app, port=port))
+
+    async def serve() -> None:
+        tasks = [asyncio.create_task(server.serve()) for server in (backend, frontend)]
+        while not (backend.started and frontend.started):
+            if any(task.done() for task in tasks):
+                break  # failed to start, the error is raised below
+            await asyncio.sleep(0.05)
+        else:
+            print(  # noqa: T201
+                f"To configure your grid, open http://localhost:{port}/index.html in your browser."
+            )
+        await asyncio.gather(*tasks)
+
+    # with uvicorn[standard], uvloop is installed where it is available
+    try:
+        from uvloop import run
+    except ImportError:
+        from asyncio import run
+    run(serve())
@@ -2,24 +2,28 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import os
 import uuid
-from collections.abc import Awaitable, Callable
-from copy import deepcopy
-from typing import Annotated, ParamSpec, TypeVar
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Annotated, ParamSpec
 
-from fastapi import Depends, FastAPI, HTTPException
+import msgspec
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
 
-from mpl_grid_configurator.apply import get_drawer, wrap_svg_callback
+from mpl_grid_configurator.apply import add_to_cache, get_drawer, wrap_svg_callback
+from mpl_grid_configurator.backend.cache import SVG_CACHE, SvgCache
 from mpl_grid_configurator.backend.profiler import SessionProfiler
 from mpl_grid_configurator.backend.sessions import (
-    FIGURE_SESSIONS,
+    FIGURE_POOL,
     Session,
     SessionData,
-    create_session_token,
+    create_session,
     get_session,
+    lock_session,
 )
-from mpl_grid_configurator.backend.types import (  # noqa: TC001
+from mpl_grid_configurator.backend.types import (
     FullResponse,
     InsertRequest,
     MergeResponse,
@@ -35,32 +39,57 @@ from mpl_grid_configurator.figure_editor import FigureEditor
 from mpl_grid_configurator.layout_editor import LayoutEditor
 from mpl_grid_configurator.merge import MergeError
 from mpl_grid_configurator.merge_editor import merge, unmerge
-from mpl_grid_configurator.register import DRAW_FUNCS
+from mpl_grid_configurator.register import DRAW_FUNCS, get_func_names_json, get_revision
 from mpl_grid_configurator.render import render_layout
-from mpl_grid_configurator.traverse import are_nodes_equal
+from mpl_grid_configurator.traverse import assert_root, copy_path, iter_leafs
 from mpl_grid_configurator.types import Config  # noqa: TC001
 
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
 P = ParamSpec("P")
-R = TypeVar("R")
 logger = logging.getLogger()
+# rendering mostly holds the GIL, more threads than cores would only contend for it
+RENDER_POOL = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix="render")
+# distinguishes the registry revisions of different server runs
+ETAG_PREFIX = uuid.uuid4().hex[:8]
+
+
+def json_response(content: object) -> Response:
+    """Encode a response with msgspec.
+
+    FastAPI passes a `Response` through as is, which skips validating the (potentially deep)
+    layout against the response model and serializing it again.
+    """
+    return Response(msgspec.json.encode(content), media_type="application/json")
 
 
-# Order: functions, health, render, session
+# Order: functions, health, live, render, session
 class MainApi:
     """Endpoints for creating a session and rendering a figure."""
 
     @classmethod
     def add_endpoints(cls, app: FastAPI) -> None:
         """Add main endpoints to the FastAPI app."""
-        app.get("/functions")(cls.functions)
+        app.get("/functions", response_model=tuple[str, ...])(cls.functions)
         app.get("/health")(cls.health)
-        app.post("/render")(cls.render)
-        app.post("/session")(cls.session)
+        app.get("/live")(cls.live)
+        app.post("/render", response_model=FullResponse)(cls.render)
+        app.post("/session", response_model=FullResponse)(cls.session)
 
     @staticmethod
-    async def functions() -> list[str]:
-        """Get a list of available functions."""
-        return list(DRAW_FUNCS.keys())
+    async def functions(request: Request) -> Response:
+        """Get a list of available functions.
+
+        The client can revalidate with the returned ETag, as the list only changes on registration.
+        """
+        etag = f'"{ETAG_PREFIX}-{get_revision()}"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        # the body is sent as is, skipping validation and serialization of the response
+        return Response(
+            get_func_names_json(), media_type="application/json", headers={"ETag": etag}
+        )
 
     @staticmethod
     async def health(session: Annotated[Session, Depends(get_session)]) -> bool:
@@ -68,25 +97,48 @@ class MainApi:
         del session  # unused
         return True
 
+    @staticmethod
+    async def live() -> bool:
+        """Check if the server is running, without requiring a session."""
+        return True
+
     @staticmethod
     async def render(
-        config_request: Config, session: Annotated[Session, Depends(get_session)]
-    ) -> FullResponse:
+        config_request: Config, session: Annotated[Session, Depends(lock_session)]
+    ) -> Response:
         """Render a layout."""
         prof = SessionProfiler("render")
 
         layout, figsize = config_request["layout"], config_request["figsize"]
 
+        key = SvgCache.make_key(layout, figsize)
+
         d = session.data
-        if d:
-            logger.info("Session already has data, fast-tracking")
+        if d and d.last_svg is not None and session.last_svg_key() == key:
+            logger.info("Layout and figsize are unchanged, fast-tracking")
+            response = json_response(session.response(d.last_svg, key))
+            prof.finalize()
+            return response
 
-            if figsize == d.figsize and are_nodes_equal(d.layout, layout):
-                return await wrapped(session.response, "rendering without changes", prof)
+        # the figure of the session is cleared for the new layout, so reject unknown
+        # functions before touching it
+        unknown = {leaf for leaf in iter_leafs(layout) if leaf not in DRAW_FUNCS}
+        if unknown:
+            raise HTTPException(
+                status_code=400, detail=f"Unknown functions: {', '.join(sorted(unknown))}"
+            )
+
+        # reuse the figure of the session or of an evicted one instead of creating a new one
+        prev_fig = assert_root(d.fig) if d else FIGURE_POOL.acquire()
 
         def callback() -> FullResponse:
             with prof.track("render_layout"):
-                fig, svg_callback = render_layout(layout, figsize, DRAW_FUNCS)
+                try:
+                    fig, svg_callback = render_layout(layout, figsize, DRAW_FUNCS, prev_fig)
+                except BaseException:
+                    # the figure was already cleared, it no longer matches the session's layout
+                    session.data = None
+                    raise
 
             session.data = SessionData(
                 layout=layout,
@@ -96,8 +148,10 @@ class MainApi:
                 svg_callback=svg_callback,
             )
 
+            # the figure is still needed for later edits, but saving it can be skipped
             with prof.track("render_svg"):
-                response = session.response()
+                response = session.response(SVG_CACHE.get(key), key)
+            SVG_CACHE.put(key, response["svg"])
 
             prof.finalize()
             return response
@@ -105,12 +159,9 @@ class MainApi:
         return await wrapped(callback, "rendering", prof=None)
 
     @staticmethod
-    async def session(config_request: Config) -> FullResponse:
+    async def session(config_request: Config) -> Response:
         """Create a session and render the layout."""
-        session_id = str(uuid.uuid4())
-        token = create_session_token(session_id)
-        session = Session(token=token, data=None)
-        FIGURE_SESSIONS[session_id] = session
+        session = create_session()
         return await MainApi.render(config_request, session)
 
 
@@ -121,48 +172,48 @@ class EditApi:
     @classmethod
     def add_endpoints(cls, app: FastAPI) -> None:
         """Add edit endpoints to the FastAPI app."""
-        app.post("/edit/delete")(cls.delete)
-        app.post("/edit/insert")(cls.insert)
-        app.post("/edit/merge")(cls.merge)
-        app.post("/edit/replace")(cls.replace)
-        app.post("/edit/resize")(cls.resize)
-        app.post("/edit/restructure")(cls.restructure)
-        app.post("/edit/rotate")(cls.rotate)
-        app.post("/edit/split")(cls.split)
-        app.post("/edit/swap")(cls.swap)
-        app.post("/edit/unmerge")(cls.unmerge)
+        app.post("/edit/delete", response_model=FullResponse)(cls.delete)
+        app.post("/edit/insert", response_model=FullResponse)(cls.insert)
+        app.post("/edit/merge", response_model=MergeResponse)(cls.merge)
+        app.post("/edit/replace", response_model=FullResponse)(cls.replace)
+        app.post("/edit/resize", response_model=FullResponse)(cls.resize)
+        app.post("/edit/restructure", response_model=FullResponse)(cls.restructure)
+        app.post("/edit/rotate", response_model=FullResponse)(cls.rotate)
+        app.post("/edit/split", response_model=FullResponse)(cls.split)
+        app.post("/edit/swap", response_model=FullResponse)(cls.swap)
+        app.post("/edit/unmerge", response_model=FullResponse)(cls.unmerge)
 
     @staticmethod
     async def delete(
-        path_request: PathRequest, session: Annotated[Session, Depends(get_session)]
-    ) -> FullResponse:
+        path_request: PathRequest, session: Annotated[Session, Depends(lock_session)]
+    ) -> Response:
         """Delete a leaf."""
         prof = SessionProfiler("delete")
 
-        d = session.fdata
+        d = session.start_edit()
         path = path_request["path"]
 
         with prof.track("edit_layout"):
-            layout, _, removed = LayoutEditor.delete(deepcopy(d.layout), path)
+            layout, _, removed = LayoutEditor.delete(copy_path(d.layout, path), path)
             if not isinstance(removed, str):
                 raise HTTPException(status_code=400, detail="Cannot delete nodes via API")
             d.layout = layout
 
         with prof.track("edit_figure"):
             d.fig, removed_sf = FigureEditor.delete(d.fig, path)  # mutates fig
-            d.subfigs.setdefault(removed, []).append(removed_sf)
+            add_to_cache(removed, removed_sf, d.subfigs)
 
         return await wrapped(session.response, "deleting", prof)
 
     @staticmethod
     async def insert(
         insert_request: InsertRequest,
-        session: Annotated[Session, Depends(get_session)],
-    ) -> FullResponse:
+        session: Annotated[Session, Depends(lock_session)],
+    ) -> Response:
         """Insert a new leaf."""
         prof = SessionProfiler("insert")
 
-        d = session.fdata
+        d = session.start_edit()
         path, value = insert_request["path"], insert_request["value"]
         orient, ratios = insert_request["orient"], insert_request["ratios"]
 
@@ -174,7 +225,7 @@ class EditApi:
             d.fig, removed_sf, svg_callback = FigureEditor.insert(
                 d.fig, path, orient, ratios, value, drawer
             )
-            d.subfigs.setdefault(removed, []).append(removed_sf)
+            add_to_cache(removed, removed_sf, d.subfigs)
             d.svg_callback = wrap_svg_callback(d.svg_callback, svg_callback)
 
         return await wrapped(session.response, "inserting", prof)
@@ -182,12 +233,12 @@ class EditApi:
     @staticmethod
     async def merge(
         paths_request: PathsRequest,
-        session: Annotated[Session, Depends(get_session)],
-    ) -> MergeResponse:
+        session: Annotated[Session, Depends(lock_session)],
+    ) -> Response:
         """Merge two paths."""
         prof = SessionProfiler("merge")
 
-        d = session.fdata
+        d = session.start_edit()
         path1, path2 = paths_request["pathA"], paths_request["pathB"]
 
         with prof.track("merge"):
@@ -209,16 +260,16 @@ class EditApi:
 
     @staticmethod
     async def replace(
-        replace_request: ReplaceRequest, session: Annotated[Session, Depends(get_session)]
-    ) -> FullResponse:
+        replace_request: ReplaceRequest, session: Annotated[Session, Depends(lock_session)]
+    ) -> Response:
         """Replace a node."""
         prof = SessionProfiler("replace")
 
-        d = session.fdata
+        d = session.start_edit()
         path, value = replace_request["path"], replace_request["value"]
 
         with prof.track("replace_layout"):
-            layout, _, removed = LayoutEditor.replace(deepcopy(d.layout), path, value)
+            layout, _, removed = LayoutEditor.replace(copy_path(d.layout, path), path, value)
             if not isinstance(removed, str):
                 raise HTTPException(status_code=400, detail="Cannot replace nodes via API")
             d.layout = layout
@@ -226,19 +277,19 @@ class EditApi:
         with prof.track("replace_figure"):
             drawer = get_drawer(d.subfigs, value)
             d.fig, removed_sf, svg_callback = FigureEditor.replace(d.fig, path, value, drawer)
-            d.subfigs.setdefault(removed, []).append(removed_sf)
+            add_to_cache(removed, removed_sf, d.subfigs)
             d.svg_callback = wrap_svg_callback(d.svg_callback, svg_callback)
 
         return await wrapped(session.response, "replacing", prof)
 
     @staticmethod
     async def resize(
-        resize_request: ResizeRequest, session: Annotated[Session, Depends(get_session)]
-    ) -> FullResponse:
+        resize_request: ResizeRequest, session: Annotated[Session, Depends(lock_session)]
+    ) -> Response:
         """Resize a node."""
         prof = SessionProfiler("resize")
 
-        d = session.fdata
+        d = session.start_edit()
         d.figsize = resize_request["figsize"]
 
         with prof.track("edit_figure"):
@@ -248,12 +299,12 @@ class EditApi:
 
     @staticmethod
     async def restructure(
-        restructure_request: RestructureRequest, session: Annotated[Session, Depends(get_session)]
-    ) -> FullResponse:
+        restructure_request: RestructureRequest, session: Annotated[Session, Depends(lock_session)]
+    ) -> Response:
         """Resize a node."""
         prof = SessionProfiler("restructure")
 
-        d = session.fdata
+        d = session.start_edit()
 
         if restructure_info := restructure_request["rowRestructureInfo"]:
             with prof.track("edit_layout_row"):
@@ -270,13 +321,13 @@ class EditApi:
 
     @staticmethod
     async def rotate(
-        path_request: PathRequest, session: Annotated[Session, Depends(get_session)]
-    ) -> FullResponse:
+        path_request: PathRequest, session: Annotated[Session, Depends(lock_session)]
+    ) -> Response:
         """Rotate a parent."""
         prof = SessionProfiler("rotate")
 
         path = path_request["path"]
-        d = session.fdata
+        d = session.start_edit()
 
         with prof.track("edit_layout"):
             d.layout, _ = LayoutEditor.rotate(d.layout, path)
@@ -288,13 +339,13 @@ class EditApi:
 
     @staticmethod
     async def split(
-        path_orient_request: PathOrientRequest, session: Annotated[Session, Depends(get_session)]
-    ) -> FullResponse:
+        path_orient_request: PathOrientRequest, session: Annotated[Session, Depends(lock_session)]
+    ) -> Response:
         """Split a node."""
         prof = SessionProfiler("split")
 
         path, orient = path_orient_request["path"], path_orient_request["orient"]
-        d = session.fdata
+        d = session.start_edit()
 
         with prof.track("edit_layout"):
             d.layout, _ = LayoutEditor.split(d.layout, path, orient)
@@ -306,13 +357,13 @@ class EditApi:
 
     @staticmethod
     async def swap(
-        paths_request: PathsRequest, session: Annotated[Session, Depends(get_session)]
-    ) -> FullResponse:
+        paths_request: PathsRequest, session: Annotated[Session, Depends(lock_session)]
+    ) -> Response:
         """Swap two leaves."""
         prof = SessionProfiler("swap")
 
         path1, path2 = paths_request["pathA"], paths_request["pathB"]
-        d = session.fdata
+        d = session.start_edit()
 
         with prof.track("edit_layout"):
             d.layout, _ = LayoutEditor.swap(d.layout, path1, path2)
@@ -324,13 +375,13 @@ class EditApi:
 
     @staticmethod
     async def unmerge(
-        unmerge_request: UnmergeRequest, session: Annotated[Session, Depends(get_session)]
-    ) -> FullResponse:
+        unmerge_request: UnmergeRequest, session: Annotated[Session, Depends(lock_session)]
+    ) -> Response:
         """Unmerge two paths."""
         prof = SessionProfiler("unmerge")
 
         inverse = unmerge_request["inverse"]
-        d = session.fdata
+        d = session.start_edit()
 
         with prof.track("unmerge"):
             d.layout, d.fig, d.svg_callback = unmerge(
@@ -341,25 +392,24 @@ class EditApi:
 
 
 async def wrapped(
-    func: Callable[..., R] | Callable[[], Awaitable[R]],
+    func: Callable[[], object],
     name: str,
     prof: SessionProfiler | None,
-) -> R:
-    """Wrap a function to catch exceptions."""
+) -> Response:
+    """Run a blocking function in a thread, encode its result and catch exceptions."""
 
-    async def run_func() -> R:
-        result = func()
-        if isinstance(result, Awaitable):
-            return await result
-        return result
+    def run_func() -> Response:
+        return json_response(func())
 
+    loop = asyncio.get_running_loop()
     try:
+        # rendering blocks, so run it in a thread to keep serving other requests
         if prof:
             with prof.track("render_svg"):
-                result = await run_func()
+                result = await loop.run_in_executor(RENDER_POOL, run_func)
             prof.finalize()
         else:
-            result = await run_func()
+            result = await loop.run_in_executor(RENDER_POOL, run_func)
 
     except Exception as e:
         logger.exception("Unexpected error during %s", name)
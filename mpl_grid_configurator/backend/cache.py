@@ -0,0 +1,83 @@
+"""Cache rendered svgs across sessions."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, TypeAlias
+
+from mpl_grid_configurator.register import get_revision
+
+if TYPE_CHECKING:
+    from mpl_grid_configurator.types import FigureSize, Layout
+
+SvgKey: TypeAlias = tuple[bytes, tuple[float, float], int]
+
+DEFAULT_MAX_SIZE = 128
+
+
+def canonicalize(layout: Layout) -> str:
+    """Serialize a layout in pre-order, equal ratios are written the same if int or float."""
+    parts: list[str] = []
+    stack = [layout]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, str):
+            parts.append(json.dumps(node))
+            continue
+        ratio1, ratio2 = node["ratios"]
+        parts.append(f"{node['orient']}({float(ratio1)!r},{float(ratio2)!r})")
+        child1, child2 = node["children"]
+        stack.extend((child2, child1))
+    return " ".join(parts)
+
+
+class SvgCache:
+    """Least recently used cache of rendered svgs.
+
+    The draw functions are expected to be deterministic, the registry revision is part
+    of the key, so (re-)registering a function invalidates all entries.
+    Renders run in worker threads, so the cache is guarded by a lock.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE) -> None:
+        """Initialize the cache."""
+        self.max_size = max_size
+        self._svgs: OrderedDict[SvgKey, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(layout: Layout, figsize: FigureSize) -> SvgKey:
+        """Create a canonical key for a layout rendered at a figsize.
+
+        The layout is stored as a digest, so that large layouts are cheap to hash and compare.
+        """
+        width, height = figsize
+        digest = hashlib.blake2b(canonicalize(layout).encode(), digest_size=16).digest()
+        return digest, (width, height), get_revision()
+
+    def get(self, key: SvgKey) -> str | None:
+        """Get a cached svg and mark it as recently used."""
+        with self._lock:
+            svg = self._svgs.get(key)
+            if svg is not None:
+                self._svgs.move_to_end(key)
+            return svg
+
+    def put(self, key: SvgKey, svg: str) -> None:
+        """Cache a svg, evicting the least recently used one if full."""
+        with self._lock:
+            self._svgs[key] = svg
+            self._svgs.move_to_end(key)
+            if len(self._svgs) > self.max_size:
+                self._svgs.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached svgs."""
+        with self._lock:
+            self._svgs.clear()
+
+
+SVG_CACHE = SvgCache()
@@ -5,7 +5,7 @@ from __future__ import annotations
 import logging
 import os
 import time
-from contextlib import contextmanager
+from contextlib import AbstractContextManager, contextmanager, nullcontext
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -15,6 +15,9 @@ if TYPE_CHECKING:
 PROFILING_ENABLED = bool(os.getenv("MPL_PROFILE"))
 logger = logging.getLogger(__name__)
 
+# shared by all disabled tracks, so no generator is created per call
+_NULL_CONTEXT = nullcontext()
+
 
 class SessionProfiler:
     """Profile API endpoints during a session."""
@@ -25,12 +28,14 @@ class SessionProfiler:
         self.timings: dict[str, float] = {}
         self.start_total = time.perf_counter()
 
-    @contextmanager
-    def track(self, label: str) -> Generator[None]:
+    def track(self, label: str) -> AbstractContextManager[None]:
         """Track a function."""
         if not PROFILING_ENABLED:
-            yield
-            return
+            return _NULL_CONTEXT
+        return self._track(label)
+
+    @contextmanager
+    def _track(self, label: str) -> Generator[None]:
         start = time.perf_counter()
         yield
         self.timings[label] = time.perf_counter() - start
@@ -3,7 +3,8 @@ from __future__ import annotations
 import logging
 import os
 import time
-from contextlib import contextmanager
+import traceback
+from contextlib import AbstractContextManager, contextmanager, nullcontext
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
@@ -24,6 +25,9 @@ logger = logging.getLogger(__name__)
 PROFILE_LEVEL = int(os.getenv("MPL_PROFILE", "0"))
 PROFILE_DIR = Path("profiles")
 
+# shared by all disabled tracks, so no generator is created per call
+_NULL_CONTEXT = nullcontext()
+
 
 class DrawContext(TypedDict):
     """Context for draw calls."""
@@ -31,6 +35,8 @@ class DrawContext(TypedDict):
     paths: dict[SubFigure, LPath]
     times: dict[LPath, float]
     names: dict[LPath, str | None]
+    # time since the first draw and the drawn type, logged once after saving
+    events: list[tuple[float, str]]
 
 
 class SessionProfiler:
@@ -42,12 +48,14 @@ class SessionProfiler:
         self.timings: dict[str, float] = {}
         self.start_total = time.perf_counter()
 
-    @contextmanager
-    def track(self, label: str) -> Generator[None, None, None]:
+    def track(self, label: str) -> AbstractContextManager[None]:
         """Track a logical step."""
         if PROFILE_LEVEL < 1:
-            yield
-            return
+            return _NULL_CONTEXT
+        return self._track(label)
+
+    @contextmanager
+    def _track(self, label: str) -> Generator[None, None, None]:
         start = time.perf_counter()
         yield
         self.timings[label] = time.perf_counter() - start
@@ -68,7 +76,7 @@ def setup_profiling() -> None:  # noqa: C901
         return
 
     # store context during the draw recursive call
-    draw_context: DrawContext = {"paths": {}, "times": {}, "names": {}}
+    draw_context: DrawContext = {"paths": {}, "times": {}, "names": {}, "events": []}
     orig_draw = SubFigure.draw
 
     first_draw_time = time.perf_counter()
@@ -76,18 +84,14 @@ def setup_profiling() -> None:  # noqa: C901
     artist_draw = Artist.draw
 
     def draw(self: Artist, renderer: RendererBase) -> None:
-        print(
-            f"(ARTIST, {type(self)}) time since first draw:", time.perf_counter() - first_draw_time
-        )
+        # printing per artist is slow enough to distort the timings, so buffer the events
+        draw_context["events"].append((time.perf_counter() - first_draw_time, type(self).__name__))
         artist_draw(self, renderer)
 
     Artist.draw = draw  # type: ignore[method-assign]
 
     def tracking_draw(self: SubFigure, renderer: RendererBase) -> None:
-        print(
-            f"(SUBFIGURE, {type(self)}) time since first draw:",
-            time.perf_counter() - first_draw_time,
-        )
+        draw_context["events"].append((time.perf_counter() - first_draw_time, type(self).__name__))
         path = draw_context["paths"][self]
         start = time.perf_counter()
         res = orig_draw(self, renderer)
@@ -103,6 +107,7 @@ def setup_profiling() -> None:  # noqa: C901
         # Clear previous run data
         draw_context["paths"].clear()
         draw_context["times"].clear()
+        draw_context["events"].clear()
 
         # Build path map for the tree
         def map_tree(curr: Any, path: LPath) -> None:
@@ -139,6 +144,11 @@ def setup_profiling() -> None:  # noqa: C901
             first_draw_time = time.perf_counter()
             orig_savefig(self, fname, **kwargs)
 
+        logger.info(
+            "Draw events (time since first draw, type):\n%s",
+            "\n".join(f"{elapsed:.4f}s {name}" for elapsed, name in draw_context["events"]),
+        )
+
         # Print the subfigure tree
         if PROFILE_LEVEL >= 2:  # noqa: PLR2004
             for path in sorted(draw_context["times"]):
@@ -168,8 +178,6 @@ def setup_profiling() -> None:  # noqa: C901
 
     def only_once(self: Figure, renderer: RendererBase) -> None:
         # log the function stack
-        import traceback
-
         logger.warning("Function stack: %s", "\n".join(traceback.format_stack()))
         nonlocal called
         if called:
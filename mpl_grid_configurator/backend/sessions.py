@@ -2,44 +2,46 @@
 
 from __future__ import annotations
 
+import asyncio
+import heapq
 import logging
 import os
 import secrets
-from datetime import datetime, timedelta, timezone
+import threading
+import time
+from collections import OrderedDict, deque
 from typing import TYPE_CHECKING, Annotated
 
 import dotenv
-import jwt
 import msgspec
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from matplotlib.figure import Figure
+
+from mpl_grid_configurator.backend.cache import SvgCache
+from mpl_grid_configurator.register import get_revision
+from mpl_grid_configurator.render import render_svg
+from mpl_grid_configurator.traverse import assert_root
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import AsyncIterator, Callable
 
+    from mpl_grid_configurator.backend.cache import SvgKey
     from mpl_grid_configurator.backend.types import FullResponse
-    from mpl_grid_configurator.types import FigureSize, Layout, SubFigure_
+    from mpl_grid_configurator.types import Figure_, FigureSize, Layout, SubFigure_
 
 logger = logging.getLogger(__name__)
 dotenv.load_dotenv()
 DEFAULT_EXPIRE_MINUTES = 30
-ALGORITHM = "HS256"
-
-
-def get_secret_key() -> str:
-    """Get the secret key from the environment or generate a random one."""
-    if secret_key := os.getenv("JWT_SECRET_KEY"):
-        return secret_key
-    logger.warning("JWT_SECRET_KEY is not set, generating a random key")
-    return secrets.token_urlsafe(32)
-
-
-SECRET_KEY = get_secret_key()
-EXPIRE_MINUTES = int(os.getenv("JWT_EXPIRE_MINUTES", DEFAULT_EXPIRE_MINUTES))
+DEFAULT_MAX_SESSIONS = int(os.getenv("MPL_MAX_SESSIONS", "256"))
+DEFAULT_MAX_POOLED_FIGURES = int(os.getenv("MPL_FIGURE_POOL_SIZE", "16"))
+# JWT_EXPIRE_MINUTES is the name from when the tokens were JWTs
+EXPIRE_MINUTES = int(
+    os.getenv("SESSION_EXPIRE_MINUTES", os.getenv("JWT_EXPIRE_MINUTES", DEFAULT_EXPIRE_MINUTES))
+)
+EXPIRE_SECONDS = EXPIRE_MINUTES * 60
 auth_scheme = HTTPBearer()
 
-FIGURE_SESSIONS: dict[str, Session] = {}
-
 
 class SessionData(msgspec.Struct):
     """Session figure."""
@@ -49,6 +51,11 @@ class SessionData(msgspec.Struct):
     fig: SubFigure_
     subfigs: dict[str, list[SubFigure_]]
     svg_callback: Callable[[str], str]
+    last_svg: str | None = None
+    # the svg cache key of the last svg, computed on the first render which compares it
+    svg_key: SvgKey | None = None
+    # the registry revision the last svg was rendered with
+    svg_revision: int = -1
 
 
 class Session(msgspec.Struct):
@@ -56,6 +63,9 @@ class Session(msgspec.Struct):
 
     token: str
     data: SessionData | None
+    expires_at: float
+    # requests of a session mutate its figure, so they must not overlap
+    lock: asyncio.Lock = msgspec.field(default_factory=asyncio.Lock)
 
     @property
     def fdata(self) -> SessionData:
@@ -64,41 +74,189 @@ class Session(msgspec.Struct):
             raise ValueError("Can't access data from an empty session")
         return self.data
 
-    def response(self) -> FullResponse:
-        """Create a full response from the current session."""
-        from mpl_grid_configurator.render import render_svg  # circular import
+    def start_edit(self) -> SessionData:
+        """Get the data for an edit, the svg of the last response becomes outdated."""
+        if self.data is None:
+            # e.g. after a failed render, which left no figure to edit
+            raise HTTPException(status_code=409, detail="No layout rendered in this session")
+        d = self.data
+        d.last_svg = d.svg_key = None
+        return d
+
+    def last_svg_key(self) -> SvgKey | None:
+        """Get the svg cache key of the last svg, None if there is no valid last svg."""
+        d = self.data
+        if d is None or d.last_svg is None or d.svg_revision != get_revision():
+            return None
+        if d.svg_key is None:
+            # edits do not need the key, so hashing the layout is deferred until a render
+            d.svg_key = SvgCache.make_key(d.layout, d.figsize)
+        return d.svg_key
+
+    def response(self, svg: str | None = None, key: SvgKey | None = None) -> FullResponse:
+        """Create a full response from the current session.
 
+        Args:
+            svg: An already rendered svg of the session's figure, otherwise it is rendered.
+            key: The svg cache key of the session's layout and figsize, if already computed,
+                otherwise it is computed by the next render which needs it.
+        """
         d = self.fdata
+        if svg is None:
+            svg = render_svg(d.fig, d.svg_callback)
+        # remembered to answer a render of the unchanged layout without comparing trees
+        d.last_svg = svg
+        d.svg_key = key
+        d.svg_revision = get_revision()
 
         return {
             "token": self.token,
             "figsize": d.figsize,
             "layout": d.layout,
-            "svg": render_svg(d.fig, d.svg_callback),
+            "svg": svg,
         }
 
 
-def create_session_token(session_id: str) -> str:
-    """Create a session token."""
-    expire = datetime.now(timezone.utc) + timedelta(minutes=EXPIRE_MINUTES)
-    return jwt.encode({"sub": session_id, "exp": expire}, SECRET_KEY, algorithm=ALGORITHM)
+class FigurePool:
+    """Bounded pool of figures of evicted sessions, to be cleared and reused by new sessions."""
+
+    def __init__(self, max_size: int = DEFAULT_MAX_POOLED_FIGURES) -> None:
+        """Initialize an empty pool."""
+        self._figs: deque[Figure_] = deque(maxlen=max_size)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._figs)
+
+    def fill(self) -> None:
+        """Create blank figures until the pool is full, so that the first sessions find one."""
+        with self._lock:
+            while len(self._figs) < (self._figs.maxlen or 0):
+                # same construction as in `render_layout`
+                self._figs.append(Figure(constrained_layout=True))  # type: ignore[arg-type]
+
+    def acquire(self) -> Figure_ | None:
+        """Take a figure out of the pool, if there is any."""
+        with self._lock:
+            return self._figs.pop() if self._figs else None
+
+    def release(self, fig: Figure_) -> None:
+        """Return a figure to the pool, the oldest one is dropped if full."""
+        with self._lock:
+            self._figs.append(fig)
+
+
+class SessionStore:
+    """Least recently used store of sessions.
+
+    Every session holds a whole figure, so the least recently used session is evicted
+    once the store is full. Requests are handled in several threads, so it is guarded by a lock.
+    """
+
+    def __init__(
+        self, max_size: int = DEFAULT_MAX_SESSIONS, pool: FigurePool | None = None
+    ) -> None:
+        """Initialize an empty store.
 
+        Args:
+            max_size: The maximum number of sessions.
+            pool: A pool the figures of evicted sessions are returned to.
+        """
+        self.max_size = max_size
+        self.pool = pool
+        self._sessions: OrderedDict[str, Session] = OrderedDict()
+        # (expires_at, session_id) of the added sessions, ordered by expiry
+        self._expiry: list[tuple[float, str]] = []
+        self._lock = threading.Lock()
 
-def get_session(
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: object) -> bool:
+        return session_id in self._sessions
+
+    def __setitem__(self, session_id: str, session: Session) -> None:
+        """Add a session, evicting expired sessions and the least recently used one if full."""
+        with self._lock:
+            self._sessions[session_id] = session
+            self._sessions.move_to_end(session_id)
+
+            heapq.heappush(self._expiry, (session.expires_at, session_id))
+
+            # the store is ordered by use, the sessions are swept in the order they expire
+            # instead, stopping at the first one which has not expired yet
+            now = time.monotonic()
+            while self._expiry and self._expiry[0][0] <= now:
+                _, expired_id = heapq.heappop(self._expiry)
+                expired = self._sessions.get(expired_id)
+                # already removed, e.g. evicted, entries are just dropped
+                if expired is not None and expired.expires_at <= now:
+                    del self._sessions[expired_id]
+                    self._release(expired)
+            if len(self._sessions) > self.max_size:
+                _, evicted = self._sessions.popitem(last=False)
+                logger.info("Evicted the least recently used session")
+                self._release(evicted)
+
+    def _release(self, session: Session) -> None:
+        # a locked session is still handling a request, which may use the figure
+        if self.pool is not None and session.data is not None and not session.lock.locked():
+            self.pool.release(assert_root(session.data.fig))
+
+    def get(self, session_id: str) -> Session | None:
+        """Get a session and mark it as recently used."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def discard(self, session_id: str) -> None:
+        """Remove a session and return its figure to the pool, like an expired one."""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is not None:
+                self._release(session)
+
+
+FIGURE_POOL = FigurePool()
+FIGURE_SESSIONS = SessionStore(pool=FIGURE_POOL)
+
+
+def create_session() -> Session:
+    """Create and store a session without data.
+
+    The token is an opaque random string, which is also the key of the session in the store,
+    so verifying it is a single lookup.
+    """
+    token = secrets.token_urlsafe(32)
+    session = Session(token=token, data=None, expires_at=time.monotonic() + EXPIRE_SECONDS)
+    FIGURE_SESSIONS[token] = session
+    return session
+
+
+async def get_session(
     auth: Annotated[HTTPAuthorizationCredentials, Depends(auth_scheme)],
 ) -> Session:
-    """Get the session from the authorization header."""
+    """Get the session from the authorization header.
+
+    Only a lookup, so it runs on the event loop instead of being sent to the thread pool.
+    """
     if not auth.credentials:
         raise HTTPException(status_code=401, detail="No authorization header")
 
-    try:
-        payload = jwt.decode(auth.credentials, SECRET_KEY, algorithms=[ALGORITHM])
-        session_id = payload["sub"]
-        if session := FIGURE_SESSIONS.get(session_id):
-            return session
-        raise HTTPException(status_code=401, detail="Session not found")
+    session = FIGURE_SESSIONS.get(auth.credentials)
+    if session is None:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    if session.expires_at <= time.monotonic():
+        FIGURE_SESSIONS.discard(auth.credentials)
+        raise HTTPException(status_code=401, detail="Expired token")
+    return session
+
 
-    except jwt.ExpiredSignatureError as e:
-        raise HTTPException(status_code=401, detail="Expired token") from e
-    except jwt.InvalidTokenError as e:
-        raise HTTPException(status_code=401, detail="Invalid token") from e
+async def lock_session(
+    session: Annotated[Session, Depends(get_session)],
+) -> AsyncIterator[Session]:
+    """Get the session and hold its lock until the request is handled."""
+    async with session.lock:
+        yield session
@@ -9,7 +9,7 @@ from matplotlib.figure import Figure, SubFigure
 
 from mpl_grid_configurator.register import DRAW_FUNCS
 from mpl_grid_configurator.render import render_recursive, savefig
-from mpl_grid_configurator.traverse import almost_equal, find_path_by_id
+from mpl_grid_configurator.traverse import almost_equal, build_id_path_map
 
 if TYPE_CHECKING:
     from _typeshed import StrPath
@@ -78,8 +78,9 @@ def print_fig_tree(
 
 def are_siblings(root: LayoutNode, id1: str, id2: str, *, use_full_id: bool = False) -> bool:
     """Check if two leafs are siblings by id."""
-    path1 = find_path_by_id(root, id1, use_full_id=use_full_id)
-    path2 = find_path_by_id(root, id2, use_full_id=use_full_id)
+    id_paths = build_id_path_map(root, use_full_id=use_full_id)
+    path1 = id_paths.get(id1)
+    path2 = id_paths.get(id2)
     if path1 is None or path2 is None:
         raise ValueError("Node not found")
     return path1[:-1] == path2[:-1]
@@ -87,7 +88,10 @@ def are_siblings(root: LayoutNode, id1: str, id2: str, *, use_full_id: bool = Fa
 
 def are_bbox_mappings_equal(a: Mapping[str, BoundingBox], b: Mapping[str, BoundingBox]) -> bool:
     """Check if two bounding box mappings are equal."""
-    return set(a) == set(b) and all(
+    # bounding boxes are tuples, so exactly equal mappings are compared without python loops
+    if a == b:
+        return True
+    return a.keys() == b.keys() and all(
         almost_equal(a[key].x_min, b[key].x_min)
         and almost_equal(a[key].x_max, b[key].x_max)
         and almost_equal(a[key].y_min, b[key].y_min)
@@ -11,18 +11,47 @@ from matplotlib.figure import Figure, SubFigure
 from mpl_grid_configurator.register import DRAW_FUNCS
 from mpl_grid_configurator.render import (
     DEFAULT_LEAF,
+    keep_svg,
     run_draw_func,
 )
 from mpl_grid_configurator.traverse import get_subfig
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Iterator
 
     from mpl_grid_configurator.types import DrawFunc, FigureSize, LPath, Orient, Ratios, SubFigure_
 
 logger = logging.getLogger(__name__)
 
 
+def iter_subfigs(sf: SubFigure_) -> Iterator[SubFigure_]:
+    """Iterate over a subfigure and all of its nested subfigures."""
+    stack = [sf]
+    while stack:
+        curr = stack.pop()
+        yield curr
+        stack.extend(curr.subfigs)
+
+
+def detach_axes(sf: SubFigure_) -> None:
+    """Remove the axes of a subfigure removed from the tree from the figure.
+
+    Subfigures share the axes stack of the figure, which would otherwise keep the axes
+    (and the subfigure) alive and break clearing the figure. The subfigures keep their axes,
+    so they can be attached again.
+    """
+    for curr in iter_subfigs(sf):
+        for ax in curr.axes:
+            curr._axstack.remove(ax)
+
+
+def attach_axes(sf: SubFigure_) -> None:
+    """Add the axes of a detached subfigure to the figure again."""
+    for curr in iter_subfigs(sf):
+        for ax in curr.axes:
+            curr._axstack.add(ax)
+
+
 class FigureEditor:
     """Figure editor. Mutates the figure."""
 
@@ -45,6 +74,7 @@ class FigureEditor:
         keep_sf._parent = grandpa
         keep_sf._subplotspec = parent._subplotspec
         grandpa.subfigs[parent_ix] = keep_sf
+        detach_axes(sf)
 
         if not parent_path:
             return keep_sf, sf
@@ -104,18 +134,17 @@ class FigureEditor:
             new_sf.patch.set_visible(False)
             svg_callback = run_draw_func(value, drawer, new_sf)
         else:
-
-            def svg_callback(_: str) -> str:
-                return _
-
+            svg_callback = keep_svg
             # passing a cached SubFigure
             new_sf = drawer
             new_sf._name = value  # type: ignore[attr-defined]
             new_sf._parent = parent
             new_sf._subplotspec = sf._subplotspec
+            attach_axes(new_sf)
 
         # swap the references in the parent
         parent.subfigs[ix] = new_sf
+        detach_axes(sf)
 
         if hasattr(sf, "_name"):
             del sf._name  # type: ignore[attr-defined]
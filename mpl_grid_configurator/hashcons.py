@@ -0,0 +1,62 @@
+"""Number structurally equal layouts the same (hash-consing)."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable
+
+    from mpl_grid_configurator.types import Layout, LayoutNode
+
+
+class LayoutInterner:
+    """Assign a number to every layout, structurally equal layouts get the same number.
+
+    Comparing two subtrees is then a single integer comparison instead of a deep comparison.
+    The numbers are memoized per node object and are only valid as long as the nodes
+    are not mutated.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty interner."""
+        self._table: dict[Hashable, int] = {}
+        # hold a reference to the node, so its id can not be reused
+        self._numbers: dict[int, tuple[LayoutNode, int]] = {}
+
+    def _number_of(self, key: Hashable) -> int:
+        return self._table.setdefault(key, len(self._table))
+
+    def intern(self, layout: Layout) -> int:
+        """Get the number of a layout, numbering all of its subtrees on the way."""
+        if isinstance(layout, str):
+            return self._number_of(layout)
+
+        # post-order traversal, the children are numbered before their parent
+        stack: list[tuple[LayoutNode, bool]] = [(layout, False)]
+        while stack:
+            node, children_done = stack.pop()
+            if id(node) in self._numbers:
+                continue
+            child1, child2 = node["children"]
+            if not children_done:
+                stack.append((node, True))
+                stack.extend(
+                    (child, False) for child in (child2, child1) if not isinstance(child, str)
+                )
+                continue
+            ratio1, ratio2 = node["ratios"]
+            key = (node["orient"], ratio1, ratio2, self._get(child1), self._get(child2))
+            self._numbers[id(node)] = (node, self._number_of(key))
+        return self._numbers[id(layout)][1]
+
+    def _get(self, layout: Layout) -> int:
+        if isinstance(layout, str):
+            return self._number_of(layout)
+        return self._numbers[id(layout)][1]
+
+    def are_equal(self, layout1: Layout, layout2: Layout) -> bool:
+        """Check if two layouts are structurally equal."""
+        if layout1 is layout2:
+            return True
+        return self.intern(layout1) == self.intern(layout2)
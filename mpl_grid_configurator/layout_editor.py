@@ -11,15 +11,15 @@ from mpl_grid_configurator.render import (
     DefaultLeafT,
 )
 from mpl_grid_configurator.traverse import (
-    almost_equal,
+    are_ratios_equal,
     get_at,
     get_node,
     set_node,
 )
+from mpl_grid_configurator.types import Change
 
 if TYPE_CHECKING:
     from mpl_grid_configurator.types import (
-        Change,
         Layout,
         LayoutNode,
         LayoutT,
@@ -53,13 +53,13 @@ class LayoutEditor:
         sibling = parent["children"][sibling_ix]
 
         if curr_ix == 1 and parent["ratios"] == DEFAULT_RATIOS and removed == DEFAULT_LEAF:
-            backward: Change = (
+            backward = Change(
                 "split",
                 parent_path,
                 {"orient": parent["orient"]},
             )
         else:
-            backward = (
+            backward = Change(
                 "insert",
                 path,
                 {"orient": parent["orient"], "ratios": parent["ratios"], "value": removed},
@@ -102,7 +102,7 @@ class LayoutEditor:
             layout, _ = cls.swap(layout, (*parent_path, 0), (*parent_path, 1))
 
         layout, _, _ = cls.replace(layout, path, value)  # type: ignore[type-var]
-        return layout, ("delete", path, {}), DEFAULT_LEAF
+        return layout, Change("delete", path, {}), DEFAULT_LEAF
 
     @staticmethod
     def replace(
@@ -119,7 +119,7 @@ class LayoutEditor:
         layout = set_node(layout, path, value)
         if value == removed:
             raise ValueError("Replaced with same content")
-        backward: Change = ("replace", path, {"value": removed})
+        backward = Change("replace", path, {"value": removed})
         return layout, backward, removed
 
     @staticmethod
@@ -130,12 +130,13 @@ class LayoutEditor:
 
         node = get_node(layout, path)
         prev = node["ratios"]
-        if almost_equal(prev[0] / prev[1], ratios[0] / ratios[1]):
+        if are_ratios_equal(prev, ratios):
             raise ValueError("No or too small ratios change")
 
+        # the node is changed in place, no need to walk the path again
         node["ratios"] = ratios
 
-        return set_node(layout, path, node), ("restructure", path, {"ratios": prev})
+        return layout, Change("restructure", path, {"ratios": prev})
 
     @staticmethod
     def rotate(layout: Layout, path: LPath) -> tuple[Layout, Change]:
@@ -146,7 +147,7 @@ class LayoutEditor:
         node = get_node(layout, path)
         node["orient"] = "column" if node["orient"] == "row" else "row"
 
-        return set_node(layout, path, node), ("rotate", path, {})
+        return set_node(layout, path, node), Change("rotate", path, {})
 
     @staticmethod
     def split(layout: Layout, path: LPath, orient: Orient) -> tuple[Layout, Change]:
@@ -158,14 +159,14 @@ class LayoutEditor:
             "ratios": DEFAULT_RATIOS,
         }
 
-        return set_node(layout, path, new_node), ("delete", (*path, 1), {})
+        return set_node(layout, path, new_node), Change("delete", (*path, 1), {})
 
     @staticmethod
     def swap(layout: Layout, path1: LPath, path2: LPath) -> tuple[Layout, Change]:
         """Swap two elements in the layout."""
         if isinstance(layout, str):
             raise ValueError("Cannot swap root")  # noqa: TRY004
-        backward: Change = "swap", path1, {"path2": path2}
+        backward = Change("swap", path1, {"path2": path2})
         if path1 == path2:
             logger.debug("Paths are the same, nothing to do")
             return layout, backward
@@ -3,16 +3,17 @@
 from __future__ import annotations
 
 import logging
-import uuid
 from copy import deepcopy
 from typing import TYPE_CHECKING
 
 from mpl_grid_configurator.traverse import (
+    EPSILON,
     adjust_node_id,
     almost_equal,
     find_path_by_id,
     get_lca,
     get_leaf,
+    new_node_id,
     set_node,
 )
 from mpl_grid_configurator.types import BoundingBox, Edge, Layout, LayoutNode, LPath, Orient
@@ -68,25 +69,30 @@ def get_bbox_mapping(
     if bbox is None:
         bbox = BoundingBox(0.0, 1.0, 0.0, 1.0)
 
-    if isinstance(node, str):
-        if node in mapping:
-            raise ValueError(f"Node {node} already in mapping")
-        mapping[node] = bbox
-        return mapping
-
-    orient = node["orient"]
-    is_row = orient == "row"
-    ratio1, ratio2 = node["ratios"]
-    total = ratio1 + ratio2
-
-    for child, start_ratio, end_ratio in zip(
-        node["children"], (0, ratio1 / total), (ratio1 / total, 1), strict=True
-    ):
-        x_edge, y_edge = get_edge(bbox, "row"), get_edge(bbox, "column")
-        edge, other = (x_edge, y_edge) if is_row else (y_edge, x_edge)
-        new_edge = Edge(edge.min + edge.size * start_ratio, edge.min + edge.size * end_ratio)
-        new_bbox = BoundingBox(*new_edge, *other) if is_row else BoundingBox(*other, *new_edge)
-        get_bbox_mapping(child, new_bbox, mapping)
+    # pre-order traversal, so the leafs are added in the same order as by a recursion
+    stack: list[tuple[Layout, BoundingBox]] = [(node, bbox)]
+    while stack:
+        curr, curr_bbox = stack.pop()
+        if isinstance(curr, str):
+            if curr in mapping:
+                raise ValueError(f"Node {curr} already in mapping")
+            mapping[curr] = curr_bbox
+            continue
+
+        ratio1, ratio2 = curr["ratios"]
+        split = ratio1 / (ratio1 + ratio2)
+        child1, child2 = curr["children"]
+        x_min, x_max, y_min, y_max = curr_bbox
+        if curr["orient"] == "row":
+            mid = x_min + (x_max - x_min) * split
+            bbox1 = BoundingBox(x_min, mid, y_min, y_max)
+            bbox2 = BoundingBox(mid, x_max, y_min, y_max)
+        else:
+            mid = y_min + (y_max - y_min) * split
+            bbox1 = BoundingBox(x_min, x_max, y_min, mid)
+            bbox2 = BoundingBox(x_min, x_max, mid, y_max)
+        stack.append((child2, bbox2))
+        stack.append((child1, bbox1))
 
     if any(bbox.x_min == bbox.x_max or bbox.y_min == bbox.y_max for bbox in mapping.values()):
         raise ValueError("Invalid bounds, edge length is zero")
@@ -102,8 +108,11 @@ def are_bboxes_touching(bbox1: BoundingBox, bbox2: BoundingBox) -> Orient | None
     Raises:
         ValueError: If the bounding boxes touch in both directions
     """
-    x_touch = almost_equal(bbox1.x_max, bbox2.x_min) or almost_equal(bbox2.x_max, bbox1.x_min)
-    y_touch = almost_equal(bbox1.y_max, bbox2.y_min) or almost_equal(bbox2.y_max, bbox1.y_min)
+    # the gap between the boxes along an axis, negative if their extents overlap
+    gap_x = max(bbox1.x_min, bbox2.x_min) - min(bbox1.x_max, bbox2.x_max)
+    gap_y = max(bbox1.y_min, bbox2.y_min) - min(bbox1.y_max, bbox2.y_max)
+    x_touch = abs(gap_x) < EPSILON
+    y_touch = abs(gap_y) < EPSILON
 
     if not (x_touch or y_touch):
         logger.debug("Bounding boxes do not touch")
@@ -113,13 +122,14 @@ def are_bboxes_touching(bbox1: BoundingBox, bbox2: BoundingBox) -> Orient | None
         logger.debug("Bounding boxes share only a corner")
         return None
 
-    children_orient: Orient = "row" if x_touch else "column"
-    edge_orient: Orient = "column" if x_touch else "row"
-    edge1, edge2 = get_edge(bbox1, edge_orient), get_edge(bbox2, edge_orient)
-    overlap_min = max(edge1.min, edge2.min)
-    overlap_max = min(edge1.max, edge2.max)
-    overlap = max(0, overlap_max - overlap_min)
-    min_size = min(edge1.size, edge2.size)
+    if x_touch:
+        children_orient: Orient = "row"
+        overlap = max(0, -gap_y)
+        min_size = min(bbox1.y_max - bbox1.y_min, bbox2.y_max - bbox2.y_min)
+    else:
+        children_orient = "column"
+        overlap = max(0, -gap_x)
+        min_size = min(bbox1.x_max - bbox1.x_min, bbox2.x_max - bbox2.x_min)
 
     if not overlap:
         logger.debug("Bounding boxes do not overlap")
@@ -148,6 +158,41 @@ def get_bbox_size(bbox_mapping: Mapping[str, BoundingBox], orient: Orient) -> fl
     )
 
 
+def find_split(bbox_mapping: Mapping[str, BoundingBox], orient: Orient) -> float | None:
+    """Find the lowest straight cut which separates the bounding boxes in the given orientation.
+
+    The boxes are swept in the order of their max edge, a cut after a box is valid if no
+    box further on starts before it.
+
+    Returns:
+        The position of the cut, None if there is none.
+    """
+    lo, hi = (0, 1) if orient == "row" else (2, 3)
+    edges = [(r[lo], r[hi]) for r in bbox_mapping.values()]
+
+    # a box spanning the whole extent is crossed by every cut
+    extent_min = min(edge_min for edge_min, _ in edges)
+    extent_max = max(edge_max for _, edge_max in edges)
+    if any(edge == (extent_min, extent_max) for edge in edges):
+        return None
+
+    edges.sort(key=lambda edge: edge[1])
+
+    # smallest min edge of all boxes from an index on
+    suffix_min = [edge_min for edge_min, _ in edges]
+    for ix in range(len(edges) - 2, -1, -1):
+        suffix_min[ix] = min(suffix_min[ix], suffix_min[ix + 1])
+
+    for ix in range(len(edges) - 1):
+        cut = edges[ix][1]
+        # boxes ending at the same position must be on the same side
+        if cut == edges[ix + 1][1]:
+            continue
+        if suffix_min[ix + 1] >= cut:
+            return cut
+    return None
+
+
 def binary_space_partitioning(bbox_mapping: Mapping[str, BoundingBox]) -> LayoutNode | str:
     """Build a tree from the given bounding boxes.
 
@@ -180,34 +225,15 @@ def binary_space_partitioning(bbox_mapping: Mapping[str, BoundingBox]) -> Layout
     if len(bbox_mapping) == 1:
         return next(iter(bbox_mapping))
 
-    x_candidates = sorted({(r.x_max, key) for key, r in bbox_mapping.items()})[:-1]
-
-    for x, key in x_candidates:
-        left_side = {key: r for key, r in bbox_mapping.items() if r.x_max <= x}
-        right_side = {key: r for key, r in bbox_mapping.items() if r.x_min >= x}
-
-        if not left_side or not right_side:
-            continue
-
-        # A split is valid if all rectangles fall into one of the two sides
-        if len(left_side) + len(right_side) == len(bbox_mapping):
-            return build_node("row", left_side, right_side)
-
-    y_candidates = sorted({(r.y_max, key) for key, r in bbox_mapping.items()})[:-1]
-
-    for y, key in y_candidates:
-        top_side = {key: r for key, r in bbox_mapping.items() if r.y_max <= y}
-        bottom_side = {key: r for key, r in bbox_mapping.items() if r.y_min >= y}
-
-        if not top_side or not bottom_side:
+    orients: tuple[Orient, ...] = ("row", "column")
+    for orient in orients:
+        split = find_split(bbox_mapping, orient)
+        if split is None:
             continue
-
-        if len(top_side) + len(bottom_side) == len(bbox_mapping):
-            return build_node(
-                "column",
-                top_side,
-                bottom_side,
-            )
+        lo, hi = (0, 1) if orient == "row" else (2, 3)
+        side1 = {key: r for key, r in bbox_mapping.items() if r[hi] <= split}
+        side2 = {key: r for key, r in bbox_mapping.items() if r[lo] >= split}
+        return build_node(orient, side1, side2)
 
     raise PartitioningError(
         "Non-guillotine layout detected: No clear horizontal or vertical split possible."
@@ -228,36 +254,32 @@ def rectify_bbox(
     We must adjust ANY box that shares the old boundaries to the new target boundaries
     to maintain "guillotine" integrity (straight lines across the layout).
     """
-    other_orient: Orient = "column" if orient == "row" else "row"
-
-    edge1 = get_edge(bbox1, other_orient)
-    edge2 = get_edge(bbox2, other_orient)
-
-    target_min = min(edge1.min, edge2.min)
-    target_max = max(edge1.max, edge2.max)
+    # the edges along the non-touching axis, as plain floats
+    if orient == "row":
+        min1, max1, min2, max2 = bbox1.y_min, bbox1.y_max, bbox2.y_min, bbox2.y_max
+        new_min, new_max = to_rectify.y_min, to_rectify.y_max
+    else:
+        min1, max1, min2, max2 = bbox1.x_min, bbox1.x_max, bbox2.x_min, bbox2.x_max
+        new_min, new_max = to_rectify.x_min, to_rectify.x_max
 
-    curr_edge_other = get_edge(to_rectify, other_orient)
-    curr_edge = get_edge(to_rectify, orient)
+    target_min = min(min1, min2)
+    target_max = max(max1, max2)
 
     # Check if this box's min or max was aligned with either node A or node B
-    new_min, new_max = curr_edge_other.min, curr_edge_other.max
-
-    if almost_equal(new_min, edge1.min) or almost_equal(new_min, edge2.min):
+    if almost_equal(new_min, min1) or almost_equal(new_min, min2):
         new_min = target_min
-    if almost_equal(new_min, edge1.max) or almost_equal(new_min, edge2.max):
+    if almost_equal(new_min, max1) or almost_equal(new_min, max2):
         new_min = target_max
-    if almost_equal(new_max, edge1.min) or almost_equal(new_max, edge2.min):
+    if almost_equal(new_max, min1) or almost_equal(new_max, min2):
         new_max = target_min
-    if almost_equal(new_max, edge1.max) or almost_equal(new_max, edge2.max):
+    if almost_equal(new_max, max1) or almost_equal(new_max, max2):
         new_max = target_max
 
-    new_rect_edge = Edge(new_min, new_max)
-
     # Reconstruct the BoundingBox
     final = (
-        BoundingBox(*curr_edge, *new_rect_edge)
+        BoundingBox(to_rectify.x_min, to_rectify.x_max, new_min, new_max)
         if orient == "row"
-        else BoundingBox(*new_rect_edge, *curr_edge)
+        else BoundingBox(new_min, new_max, to_rectify.y_min, to_rectify.y_max)
     )
 
     if final.x_min == final.x_max or final.y_min == final.y_max:
@@ -326,7 +348,7 @@ def merge_paths(
     del adj_bbox_map[leaf2]
 
     # Create a unique ID for the merged node placeholder
-    node_id = str(uuid.uuid4())
+    node_id = new_node_id()
     merged_key = f"{node_id}:::{node_id}"
     adj_bbox_map[merged_key] = merged_bbox
 
@@ -5,7 +5,10 @@ from __future__ import annotations
 import logging
 from typing import TYPE_CHECKING
 
+import msgspec
+
 from mpl_grid_configurator.render import draw_empty
+from mpl_grid_configurator.types import get_draw_func_kind
 
 if TYPE_CHECKING:
     from mpl_grid_configurator.types import DrawFunc, DrawFuncT
@@ -13,6 +16,43 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 DRAW_FUNCS: dict[str, DrawFunc] = {}
+# last suffix used for each function name, to avoid probing all previous suffixes
+_NAME_COUNTS: dict[str, int] = {}
+# name each function was registered under, to avoid scanning all registered functions
+_FUNC_NAMES: dict[DrawFunc, str] = {}
+# bumped on every registration, so that anything derived from the registry can be invalidated
+_REVISION = 0
+# the names and their json encoding, as of a revision
+_NAMES_CACHE: tuple[int, tuple[str, ...], bytes] = (-1, (), b"[]")
+
+
+def get_revision() -> int:
+    """Get the current revision of the registry."""
+    return _REVISION
+
+
+def invalidate_registry() -> None:
+    """Bump the revision, required after modifying `DRAW_FUNCS` directly."""
+    global _REVISION  # noqa: PLW0603
+    _REVISION += 1
+
+
+def _get_names_cache() -> tuple[int, tuple[str, ...], bytes]:
+    global _NAMES_CACHE  # noqa: PLW0603
+    if _NAMES_CACHE[0] != _REVISION:
+        names = tuple(DRAW_FUNCS)
+        _NAMES_CACHE = (_REVISION, names, msgspec.json.encode(names))
+    return _NAMES_CACHE
+
+
+def get_func_names() -> tuple[str, ...]:
+    """Get the names of all registered functions, cached until the next registration."""
+    return _get_names_cache()[1]
+
+
+def get_func_names_json() -> bytes:
+    """Get the names of all registered functions encoded as json, cached like the names."""
+    return _get_names_cache()[2]
 
 
 def register(func: DrawFuncT) -> DrawFuncT:
@@ -43,17 +83,36 @@ def register(func: DrawFuncT) -> DrawFuncT:
     Returns:
         The registered function.
     """
-    if func in DRAW_FUNCS.values():
+    try:
+        registered_name = _FUNC_NAMES.get(func)
+        is_registered = registered_name is not None and DRAW_FUNCS.get(registered_name) is func
+        hashable = True
+    except TypeError:
+        # unhashable callables can not be looked up by key
+        is_registered = any(registered is func for registered in DRAW_FUNCS.values())
+        hashable = False
+    if is_registered:
         logger.warning("Function %s is already registered.", func.__name__)
         return func
 
-    # register with unique name
-    name = func.__name__
-    count = 1
+    # register with unique name, restart if the base name is free (e.g. registry was cleared)
+    base = func.__name__
+    count = _NAME_COUNTS.get(base, 0) if base in DRAW_FUNCS else 0
+    name = f"{base}_{count}" if count else base
     while name in DRAW_FUNCS:
-        name = f"{func.__name__}_{count}"
         count += 1
+        name = f"{base}_{count}"
+    _NAME_COUNTS[base] = count
+    if hashable:
+        _FUNC_NAMES[func] = name
     DRAW_FUNCS[name] = func
+    invalidate_registry()
+    # inspect the signature once now instead of on the first render, annotations which can
+    # not be resolved yet (e.g. forward references) are inspected when drawing instead
+    try:
+        get_draw_func_kind(func)
+    except Exception:
+        logger.debug("Could not inspect %s on registration", name, exc_info=True)
 
     return func
 
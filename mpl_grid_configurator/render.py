@@ -3,15 +3,17 @@
 from __future__ import annotations
 
 import io
+import json
 import logging
-from typing import IO, TYPE_CHECKING, Any, Literal, TypeAlias, TypeVar, get_args
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import IO, TYPE_CHECKING, Any, Literal, NamedTuple, TypeAlias, TypeVar, get_args
 
 from matplotlib.figure import Figure
 
-from mpl_grid_configurator.types import (
-    is_str_draw_func,
-    is_tuple_draw_func,
-)
+from mpl_grid_configurator.traverse import iter_leafs
+from mpl_grid_configurator.types import Orient, Ratios, get_draw_func_kind
+from mpl_grid_configurator.unnested_skunk import connect, insert
 
 if TYPE_CHECKING:
     from collections.abc import Callable, Mapping, MutableMapping
@@ -23,9 +25,6 @@ if TYPE_CHECKING:
         Figure_,
         FigureSize,
         Layout,
-        LayoutNode,
-        Orient,
-        Ratios,
         SubFigure_,
     )
 
@@ -43,10 +42,19 @@ def draw_empty(container: SubFigure_) -> Axes:
     return ax
 
 
+def keep_svg(svg: str) -> str:
+    """Return the svg unchanged, the svg callback if nothing has to be inserted."""
+    return svg
+
+
 DefaultLeafT: TypeAlias = Literal["draw_empty"]
 DEFAULT_DRAW_FUNC = draw_empty
 DEFAULT_LEAF: DefaultLeafT = get_args(DefaultLeafT)[0]
 DEFAULT_RATIOS: Ratios = (50, 50)
+# omit the <metadata> block, the frontend has no use for it
+SVG_METADATA: dict[str, str | None] = {"Date": None, "Creator": None, "Format": None, "Type": None}
+# shared by all renders, threads are only started on the first prefetch
+PREFETCH_POOL = ThreadPoolExecutor(thread_name_prefix="prefetch")
 
 
 def new_root(figsize: FigureSize = (8, 8)) -> tuple[Figure_, SubFigure_]:
@@ -84,69 +92,139 @@ def run_draw_func(
     svg_mapping: MutableMapping[str, str] | None = None,
 ) -> Callable[[str], str]:
     """Run a draw function."""
-    from mpl_grid_configurator.unnested_skunk import connect, insert
-
     container._name = func_name  # type: ignore[attr-defined] # noqa: SLF001
 
-    if is_tuple_draw_func(func):
+    kind = get_draw_func_kind(func)
+    if kind == "tuple":
         svg, ax = func(container)
-    elif is_str_draw_func(func):
-        svg = func()
+    elif kind == "str":
+        # the svg might have been prefetched already
+        svg = svg_mapping[func_name] if svg_mapping and func_name in svg_mapping else func()
         ax = draw_empty(container)
     else:  # it's axes draw func
         func(container)
-        return lambda final_svg: final_svg
+        return keep_svg
     connect(ax, func_name)
     if svg_mapping is not None:
         svg_mapping[func_name] = svg
     return lambda final_svg: insert({func_name: svg}, final_svg)
 
 
+def prefetch_svgs(layout: Layout, draw_funcs: Mapping[str, Callable]) -> dict[str, str]:
+    """Run the drawing functions returning only svgs concurrently.
+
+    In contrast to the other variants they do not touch the figure, which is not thread-safe.
+
+    Returns:
+        A mapping of function names to their svgs.
+    """
+    funcs: dict[str, Callable[[], str]] = {}
+    for func_name in iter_leafs(layout):
+        func = draw_funcs.get(func_name)
+        if func is not None and get_draw_func_kind(func) == "str":
+            funcs[func_name] = func
+    if len(funcs) < 2:  # noqa: PLR2004
+        # not worth starting threads, run_draw_func will call them
+        return {}
+    futures = {func_name: PREFETCH_POOL.submit(func) for func_name, func in funcs.items()}
+    return {func_name: future.result() for func_name, future in futures.items()}
+
+
+class SplitStep(NamedTuple):
+    """Split the container at `index`, the two new containers are appended to the containers."""
+
+    index: int
+    orient: Orient
+    ratios: Ratios
+
+
+class DrawStep(NamedTuple):
+    """Run the drawing function `func_name` on the container at `index`."""
+
+    index: int
+    func_name: str
+
+
+RenderStep: TypeAlias = SplitStep | DrawStep
+
+
+def compile_layout(layout: Layout) -> tuple[RenderStep, ...]:
+    """Flatten a layout into the steps needed to render it.
+
+    The steps are cached, as the same layout is rendered repeatedly while editing.
+    """
+    return _compile_layout(json.dumps(layout, sort_keys=True))
+
+
+@lru_cache(maxsize=128)
+def _compile_layout(layout_json: str) -> tuple[RenderStep, ...]:
+    steps: list[RenderStep] = []
+    n_containers = 1  # the root container
+    # the second child is pushed first, so the children are rendered in order
+    stack: list[tuple[int, Layout]] = [(0, json.loads(layout_json))]
+    while stack:
+        index, layout = stack.pop()
+        if isinstance(layout, str):
+            steps.append(DrawStep(index, layout))
+            continue
+        ratio1, ratio2 = layout["ratios"]
+        steps.append(SplitStep(index, layout["orient"], (ratio1, ratio2)))
+        child1, child2 = layout["children"]
+        stack.append((n_containers + 1, child2))
+        stack.append((n_containers, child1))
+        n_containers += 2
+    return tuple(steps)
+
+
 def render_recursive(
     container: SubFigure_,
     layout: Layout,
     draw_funcs: Mapping[str, Callable],
     svg_mapping: MutableMapping[str, str] | None = None,
 ) -> None:
-    """Render a node recursively."""
-    if isinstance(layout, str):
-        func_name: str = layout
-        if func := draw_funcs.get(func_name):
-            run_draw_func(func_name, func, container, svg_mapping)
+    """Render a node and all of its children."""
+    # subtrees of only empty leafs are still split: the figure editor addresses
+    # subfigures by their layout path, so the figure tree has to mirror the layout
+    containers = [container]
+    for step in compile_layout(layout):
+        if isinstance(step, SplitStep):
+            containers.extend(split_figure(containers[step.index], step.orient, step.ratios))
+        elif func := draw_funcs.get(step.func_name):
+            run_draw_func(step.func_name, func, containers[step.index], svg_mapping)
         else:
-            raise ValueError(f"No draw function found for {func_name}")
-    else:
-        node: LayoutNode = layout
-        sf1, sf2 = split_figure(
-            container,
-            node["orient"],
-            node["ratios"],
-        )
-        child1, child2 = node["children"]
-        render_recursive(sf1, child1, draw_funcs, svg_mapping)
-        render_recursive(sf2, child2, draw_funcs, svg_mapping)
+            raise ValueError(f"No draw function found for {step.func_name}")
 
 
 def render_layout(
-    layout: Layout, figsize: FigureSize, draw_funcs: Mapping[str, Callable]
+    layout: Layout,
+    figsize: FigureSize,
+    draw_funcs: Mapping[str, Callable],
+    fig: Figure_ | None = None,
 ) -> tuple[SubFigure_, Callable[[str], str]]:
-    """Render a layout."""
-    from matplotlib.figure import Figure
-
-    from mpl_grid_configurator.unnested_skunk import insert
-
+    """Render a layout.
+
+    Args:
+        layout: The layout to render.
+        figsize: The size of the figure.
+        draw_funcs: The drawing functions for the leafs.
+        fig: An existing figure to clear and reuse instead of creating a new one.
+    """
     width, height = figsize
 
-    # Use constrained_layout=True to ensure subplots respect the ratio boundaries
-    # and redraws the figure when the layout changes
-    fig: Figure_ = Figure(figsize=(width, height), constrained_layout=True)  # type: ignore[assignment]
+    if fig is None:
+        # Use constrained_layout=True to ensure subplots respect the ratio boundaries
+        # and redraws the figure when the layout changes
+        fig = Figure(figsize=(width, height), constrained_layout=True)  # type: ignore[assignment]
+    else:
+        fig.clear()
+        fig.set_size_inches(width, height)
     root: SubFigure_ = fig.subfigures()  # type: ignore[assignment]
 
-    svg_mapping: dict[str, str] = {}
+    svg_mapping = prefetch_svgs(layout, draw_funcs)
     render_recursive(root, layout, draw_funcs, svg_mapping)
 
     if not svg_mapping:
-        return root, lambda svg: svg
+        return root, keep_svg
 
     def svg_callback(final_svg: str) -> str:
         return insert(svg_mapping, final_svg)
@@ -156,10 +234,11 @@ def render_layout(
 
 def render_svg(root: Figure_ | SubFigure_, svg_callback: Callable[[str], str]) -> str:
     """Save a figure to svg, apply a callback and return the svg."""
-    buf = io.BytesIO()
-    savefig(root, buf, format="svg")
-    final_svg = buf.getvalue().decode("utf-8")
-    return svg_callback(final_svg)
+    # the svg backend writes text, so a text buffer avoids encoding and decoding again
+    buf = io.StringIO()
+    savefig(root, buf, format="svg", metadata=SVG_METADATA)
+    svg = buf.getvalue()
+    return svg if svg_callback is keep_svg else svg_callback(svg)
 
 
 def savefig(fig: Figure_ | SubFigure_, fname: StrPath | IO, **kwargs: Any) -> None:
@@ -2,19 +2,32 @@
 
 from __future__ import annotations
 
-import uuid
+import itertools
 from typing import TYPE_CHECKING, Literal, TypeVar, overload
 
 from matplotlib.figure import Figure
 
 if TYPE_CHECKING:
-    from mpl_grid_configurator.types import Figure_, Layout, LayoutNode, LayoutT, LPath, SubFigure_
+    from collections.abc import Iterator
+
+    from mpl_grid_configurator.types import (
+        Figure_,
+        Layout,
+        LayoutNode,
+        LayoutT,
+        LPath,
+        Ratios,
+        SubFigure_,
+    )
 
 
 T = TypeVar("T")
 
 EPSILON = 1e-9
 
+# ids only have to be unique within one merge, so a counter suffices
+_ID_COUNTER = itertools.count()
+
 
 class TraversalError(ValueError):
     """Provided path is invalid for the given operation."""
@@ -25,6 +38,13 @@ def almost_equal(a: float, b: float) -> bool:
     return abs(a - b) < EPSILON
 
 
+def are_ratios_equal(ratios1: Ratios, ratios2: Ratios) -> bool:
+    """Check if two ratios split a node the same way."""
+    if ratios1 == ratios2:
+        return True
+    return abs(ratios1[0] / ratios1[1] - ratios2[0] / ratios2[1]) < EPSILON
+
+
 def get_subfig(fig: SubFigure_, path: LPath) -> SubFigure_:
     """Get the subfigure at the given path."""
     if not path:
@@ -110,6 +130,19 @@ def set_node(node: Layout, path: LPath, value: Layout) -> Layout:
     return node
 
 
+def iter_leafs(node: Layout) -> Iterator[str]:
+    """Iterate over all leafs from left to right."""
+    stack = [node]
+    while stack:
+        curr = stack.pop()
+        if isinstance(curr, str):
+            yield curr
+        else:
+            child1, child2 = curr["children"]
+            stack.append(child2)
+            stack.append(child1)
+
+
 def get_lca_path(path1: LPath, path2: LPath) -> LPath:
     """Get the path to the lowest common ancestor of two paths."""
     common: list[int] = []
@@ -160,16 +193,63 @@ def assert_root(sf: SubFigure_) -> Figure_:
 
 def are_nodes_equal(node1: Layout, node2: Layout) -> bool:
     """Check if two nodes are equal."""
-    if isinstance(node1, str) or isinstance(node2, str):
-        return node1 == node2
+    stack = [(node1, node2)]
+    while stack:
+        curr1, curr2 = stack.pop()
+        # shared subtrees, e.g. after copying only a path, are equal without a walk
+        if curr1 is curr2:
+            continue
+        if isinstance(curr1, str) or isinstance(curr2, str):
+            if curr1 != curr2:
+                return False
+            continue
+        if curr1["orient"] != curr2["orient"] or not are_ratios_equal(
+            curr1["ratios"], curr2["ratios"]
+        ):
+            return False
+        children1, children2 = curr1["children"], curr2["children"]
+        stack.append((children1[1], children2[1]))
+        stack.append((children1[0], children2[0]))
+    return True
+
+
+def clone_layout(node: LayoutT) -> LayoutT:
+    """Copy the nodes of a layout, much faster than `deepcopy` as the schema is fixed.
+
+    Leafs and ratios are immutable and therefore shared.
+    """
+    if isinstance(node, str):
+        return node
+    children = node["children"]
+    return {
+        "orient": node["orient"],
+        "children": (clone_layout(children[0]), clone_layout(children[1])),  # type: ignore[type-var]
+        "ratios": node["ratios"],
+    }
 
-    ratios1, ratios2 = node1["ratios"], node2["ratios"]
-    return (
-        node1["orient"] == node2["orient"]
-        and almost_equal(ratios1[0] / ratios1[1], ratios2[0] / ratios2[1])
-        and are_nodes_equal(node1["children"][0], node2["children"][0])
-        and are_nodes_equal(node1["children"][1], node2["children"][1])
-    )
+
+def copy_path(node: LayoutT, path: LPath) -> LayoutT:
+    """Copy only the nodes along a path, all other nodes are shared with the original.
+
+    Editing the copied nodes, e.g. with `set_node`, leaves the original layout intact.
+    """
+    if isinstance(node, str):
+        return node
+    root = curr = node.copy()
+    for ix in path:
+        child1, child2 = curr["children"]
+        child = child1 if ix == 0 else child2
+        if isinstance(child, str):
+            break
+        child = child.copy()
+        curr["children"] = (child, child2) if ix == 0 else (child1, child)
+        curr = child
+    return root  # type: ignore[return-value]
+
+
+def new_node_id() -> str:
+    """Get a new id, unique within this process."""
+    return str(next(_ID_COUNTER))
 
 
 def adjust_node_id(node: LayoutT, mode: Literal["add", "remove"] = "add") -> LayoutT:
@@ -178,16 +258,35 @@ def adjust_node_id(node: LayoutT, mode: Literal["add", "remove"] = "add") -> Lay
     Returns:
         A copy of the node with adjusted ids.
     """
-    if isinstance(node, str):
+
+    def adjust_leaf(leaf: str) -> str:
         if mode == "add":
-            return f"{node}:::{uuid.uuid4()}"
-        return node.rsplit(":::", 1)[0]
-    children = node["children"]
-    return {
-        "orient": node["orient"],
-        "children": (adjust_node_id(children[0], mode), adjust_node_id(children[1], mode)),  # type: ignore[type-var]
-        "ratios": node["ratios"],
-    }
+            return f"{leaf}:::{new_node_id()}"
+        return leaf.rsplit(":::", 1)[0]
+
+    if isinstance(node, str):
+        return adjust_leaf(node)  # type: ignore[return-value]
+
+    # post-order traversal, the adjusted children are on top of the results when
+    # their parent is visited the second time
+    results: list[Layout] = []
+    stack: list[tuple[Layout, bool]] = [(node, False)]
+    while stack:
+        curr, children_done = stack.pop()
+        if isinstance(curr, str):
+            results.append(adjust_leaf(curr))
+            continue
+        if not children_done:
+            child1, child2 = curr["children"]
+            stack.extend(((curr, True), (child2, False), (child1, False)))
+            continue
+        child2 = results.pop()
+        child1 = results.pop()
+        # orient and ratios are shared with the input, only the leafs change
+        results.append(
+            {"orient": curr["orient"], "children": (child1, child2), "ratios": curr["ratios"]}
+        )
+    return results[0]  # type: ignore[return-value]
 
 
 def find_path_by_id(
@@ -203,18 +302,45 @@ def find_path_by_id(
         node: The node to search in.
         id_to_find: The id to search for.
         path: The current path.
-        use_full_id: Whether to use the full id (function name + optional uuid)
-            or just the uuid.
+        use_full_id: Whether to use the full id (function name + optional id)
+            or just the id.
 
     Returns:
         The path to the node with the given id or None if no such node exists.
     """
-    if isinstance(node, str):
-        curr_id = node if use_full_id else node.rsplit(":::", 1)[1]
-        return path if curr_id == id_to_find else None
-
-    for ix, child in enumerate(node["children"]):
-        result = find_path_by_id(child, id_to_find, (*path, ix), use_full_id=use_full_id)
-        if result is not None:
-            return result
+    # depth-first, first child first, so the first match is the same as by a recursion
+    stack: list[tuple[Layout, LPath]] = [(node, path)]
+    while stack:
+        curr, curr_path = stack.pop()
+        if isinstance(curr, str):
+            curr_id = curr if use_full_id else curr.rsplit(":::", 1)[1]
+            if curr_id == id_to_find:
+                return curr_path
+            continue
+        child1, child2 = curr["children"]
+        stack.extend(((child2, (*curr_path, 1)), (child1, (*curr_path, 0))))
     return None
+
+
+def build_id_path_map(node: Layout, *, use_full_id: bool = False) -> dict[str, LPath]:
+    """Map the id of every leaf to its path, to look up several ids with one traversal.
+
+    Args:
+        node: The node to search in.
+        use_full_id: Whether to use the full id (function name + optional id)
+            or just the id.
+
+    Returns:
+        The paths by id, for duplicate ids the first path found by find_path_by_id.
+    """
+    id_paths: dict[str, LPath] = {}
+    stack: list[tuple[Layout, LPath]] = [(node, ())]
+    while stack:
+        curr, curr_path = stack.pop()
+        if isinstance(curr, str):
+            curr_id = curr if use_full_id else curr.rsplit(":::", 1)[1]
+            id_paths.setdefault(curr_id, curr_path)
+            continue
+        child1, child2 = curr["children"]
+        stack.extend(((child2, (*curr_path, 1)), (child1, (*curr_path, 0))))
+    return id_paths
@@ -5,10 +5,10 @@ from __future__ import annotations
 import inspect
 from collections.abc import Callable, Iterator
 from dataclasses import dataclass
+from functools import cache, lru_cache
 from typing import (
     TYPE_CHECKING,
     Any,
-    ForwardRef,
     Literal,
     NamedTuple,
     TypeAlias,
@@ -16,8 +16,7 @@ from typing import (
     get_origin,
 )
 
-from doctyper._typing import eval_type
-from matplotlib.figure import Figure, SubFigure  # noqa: TC002
+from matplotlib.figure import Figure, SubFigure
 
 # Pydantic: Please use `typing_extensions.TypedDict` instead of `typing.TypedDict` on Python < 3.12.
 from typing_extensions import TypedDict, TypeIs
@@ -52,6 +51,7 @@ TupleDrawFunc: TypeAlias = "Callable[[SubFigure_], tuple[str, Axes]]"
 StrDrawFunc: TypeAlias = Callable[[], str]
 DrawFunc: TypeAlias = "AxesDrawFunc | TupleDrawFunc | StrDrawFunc"
 DrawFuncT = TypeVar("DrawFuncT", bound=DrawFunc)
+DrawFuncKind: TypeAlias = Literal["axes", "str", "tuple"]
 
 Orient: TypeAlias = Literal["row", "column"]
 LPath: TypeAlias = tuple[int, ...]
@@ -89,7 +89,14 @@ ChangeKey: TypeAlias = Literal[
     "split",
     "swap",
 ]
-Change: TypeAlias = tuple[ChangeKey, LPath, dict[str, Any]]
+
+
+class Change(NamedTuple):
+    """A single edit of a layout, serialized as a plain (key, path, kwargs) list."""
+
+    key: ChangeKey
+    path: LPath
+    kwargs: dict[str, Any]
 
 
 @dataclass
@@ -128,17 +135,51 @@ def is_str_draw_func(func: DrawFuncT) -> TypeIs[StrDrawFunc]:  # type: ignore[na
     return get_n_params(func) == 0
 
 
-def get_return_type(func: Callable[..., T]) -> type[T]:
-    """Get the return type of a function."""
+def get_draw_func_kind(func: DrawFunc) -> DrawFuncKind:
+    """Get the variant of a drawing function.
+
+    Cached, as inspecting the signature is slow and drawing functions run on every render.
+    Unhashable callables can not be cached and are inspected on every call.
+    """
+    try:
+        return _get_cached_draw_func_kind(func)
+    except TypeError:
+        try:
+            hash(func)
+        except TypeError:
+            return _get_draw_func_kind(func)
+        raise
+
+
+@lru_cache(maxsize=256)
+def _get_cached_draw_func_kind(func: DrawFunc) -> DrawFuncKind:
+    return _get_draw_func_kind(func)
+
+
+def _get_draw_func_kind(func: DrawFunc) -> DrawFuncKind:
+    if is_tuple_draw_func(func):
+        return "tuple"
+    if is_str_draw_func(func):
+        return "str"
+    return "axes"
+
+
+@cache
+def get_annotation_namespace() -> dict[str, Any]:
+    """Get the namespace to evaluate string annotations of drawing functions in."""
     # For parsing type annotations with __future__ import annotations
     # we need to import matplotlib types here
-    from matplotlib.axes import Axes  # noqa: F401
-    from matplotlib.figure import Figure, SubFigure  # noqa: F401
+    from matplotlib.axes import Axes
 
+    return {**globals(), "Axes": Axes, "Figure": Figure, "SubFigure": SubFigure}
+
+
+def get_return_type(func: Callable[..., T]) -> type[T]:
+    """Get the return type of a function."""
     sig = inspect.signature(func)
     annotation = sig.return_annotation
     if isinstance(annotation, str):
-        return eval_type(ForwardRef(annotation), globals(), locals())
+        return eval(annotation, get_annotation_namespace())  # noqa: S307
     return annotation
 
 
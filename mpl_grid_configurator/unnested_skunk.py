@@ -3,6 +3,7 @@
 import copy
 import warnings
 from collections.abc import Mapping
+from functools import lru_cache
 
 import lxml.etree as ET  # noqa: N812
 from matplotlib.axes import Axes
@@ -42,6 +43,18 @@ def _to_float(v: str | float) -> float:
     return float(v.removesuffix("px").removesuffix("pt"))
 
 
+@lru_cache(maxsize=64)
+def _parse_replacement(svg: str) -> ET._Element:
+    """Parse a replacement SVG.
+
+    The same svgs are inserted on every render, the parsed tree is only read.
+    """
+    try:
+        return ET.fromstring(svg.encode())
+    except ET.ParseError as e:
+        raise ValueError("Replacement SVG is not valid XML.") from e
+
+
 def insert(
     repl: Mapping[str, str],
     svg: str,
@@ -93,10 +106,7 @@ def insert(
             e.clear()
 
         # Parse replacement SVG
-        try:
-            rr = ET.fromstring(rv.encode())
-        except ET.ParseError as e:
-            raise ValueError("Replacement SVG is not valid XML.") from e
+        rr = _parse_replacement(rv)
 
         # Get intrinsic width/height of replacement SVG
         rw = _to_float(rr.attrib.get("width", dx))
@@ -6,7 +6,7 @@ from typing import TYPE_CHECKING
 import pytest
 
 from mpl_grid_configurator.debug import draw_text
-from mpl_grid_configurator.register import DRAW_FUNCS, register
+from mpl_grid_configurator.register import DRAW_FUNCS, invalidate_registry, register
 from mpl_grid_configurator.render import DEFAULT_LEAF
 
 if TYPE_CHECKING:
@@ -32,10 +32,12 @@ def reset_draw_funcs() -> Generator[None]:
     initial_draw_funcs = DRAW_FUNCS.copy()
     try:
         DRAW_FUNCS.clear()
+        invalidate_registry()
         yield
     finally:
         DRAW_FUNCS.clear()
         DRAW_FUNCS.update(initial_draw_funcs)
+        invalidate_registry()
 
 
 @pytest.fixture
@@ -46,6 +48,7 @@ def define_draw_funcs(reset_draw_funcs: None) -> None:
         return fig.add_subplot()
 
     DRAW_FUNCS[DEFAULT_LEAF] = draw_axes  # type: ignore[assignment]
+    invalidate_registry()
 
     texts = [f"f{ix}{o}" for ix in range(10) for o in ("l", "r")]
     texts += [f"f{ix}" for ix in range(10)]
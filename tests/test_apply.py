@@ -1,21 +1,33 @@
 from __future__ import annotations
 
+import gc
+import weakref
 from copy import deepcopy
 from typing import TYPE_CHECKING
 
+import pytest
 from test_merge import merge_paths_by_id
 from utils import ChangeFixture, assert_figure_equals_layout, render_fig
 
 from mpl_grid_configurator.apply import (
+    MAX_CACHED_SUBFIGS,
+    SvgCallbacks,
+    add_to_cache,
     apply_to_figure,
     apply_to_layout,
     rebuild,
+    wrap_svg_callback,
 )
+from mpl_grid_configurator.figure_editor import FigureEditor
+from mpl_grid_configurator.register import DRAW_FUNCS
+from mpl_grid_configurator.render import keep_svg, new_root, split_figure
+from mpl_grid_configurator.traverse import are_nodes_equal, assert_root
+from mpl_grid_configurator.types import Change
 
 if TYPE_CHECKING:
     from pathlib import Path
 
-    from mpl_grid_configurator.types import Layout, LayoutNode, LPath
+    from mpl_grid_configurator.types import Layout, LayoutNode, LPath, SubFigure_
 
 
 def test_apply_to_layout(change_fixture: ChangeFixture) -> None:
@@ -38,6 +50,20 @@ def test_apply_to_layout(change_fixture: ChangeFixture) -> None:
     assert forward_changes == [change]
 
 
+def test_apply_to_layout_no_changes(simple_root: LayoutNode) -> None:
+    assert apply_to_layout(simple_root, []) == (simple_root, [], [])
+
+
+def test_apply_to_layout_no_copy(simple_root: LayoutNode) -> None:
+    pre_copy = deepcopy(simple_root)
+    layout, backward, _ = apply_to_layout(simple_root, [("rotate", (1,), {})], copy=False)
+    assert layout is simple_root
+    assert layout != pre_copy
+
+    apply_to_layout(layout, backward, copy=False)
+    assert layout == pre_copy
+
+
 def test_apply_to_figure(
     change_fixture: ChangeFixture, tmp_path: Path, define_draw_funcs: None
 ) -> None:
@@ -64,9 +90,69 @@ def test_apply_to_figure(
     assert_figure_equals_layout(root, pre, tmp_path)
 
 
+def test_add_to_cache() -> None:
+    subfigs: dict[str, list[SubFigure_]] = {}
+    _, root = new_root()
+    sf1, sf2 = split_figure(root, "row", (50, 50))
+    add_to_cache({"orient": "row", "children": ("f1l", "f2l"), "ratios": (50, 50)}, root, subfigs)
+    assert subfigs == {"f1l": [sf1], "f2l": [sf2]}
+
+    for _ in range(MAX_CACHED_SUBFIGS + 2):
+        add_to_cache("f1l", sf1, subfigs)
+    assert len(subfigs["f1l"]) == MAX_CACHED_SUBFIGS
+
+
+def test_add_to_cache_frees_dropped(define_draw_funcs: None) -> None:
+    """Test that subfigures dropped from the full cache are not kept alive by the figure."""
+    del define_draw_funcs  # just for the side effect
+
+    root = render_fig("f1l")
+    fig = assert_root(root)
+    subfigs: dict[str, list[SubFigure_]] = {}
+    dropped: list[weakref.ref[SubFigure_]] = []
+    for ix in range(MAX_CACHED_SUBFIGS + 4):
+        root, removed, _ = FigureEditor.replace(root, (), "f1l", DRAW_FUNCS["f1l"])
+        if ix >= MAX_CACHED_SUBFIGS:
+            dropped.append(weakref.ref(removed))
+        add_to_cache("f1l", removed, subfigs)
+        del removed
+
+    gc.collect()
+    assert len(subfigs["f1l"]) == MAX_CACHED_SUBFIGS
+    assert all(ref() is None for ref in dropped)
+    assert len(fig.axes) == len(root.axes)
+
+
+def test_wrap_svg_callback() -> None:
+    def add_a(svg: str) -> str:
+        return svg + "a"
+
+    def add_b(svg: str) -> str:
+        return svg + "b"
+
+    assert wrap_svg_callback(keep_svg, add_a) is add_a
+    assert wrap_svg_callback(add_a, keep_svg) is add_a
+
+    wrapped = wrap_svg_callback(wrap_svg_callback(add_a, add_b), add_a)
+    assert isinstance(wrapped, SvgCallbacks)
+    # the callbacks are flattened instead of nested
+    assert wrapped.callbacks == (add_a, add_b, add_a)
+    assert wrapped("") == "aba"
+
+
+def test_apply_to_figure_fail() -> None:
+    _, root = new_root()
+    with pytest.raises(ValueError, match="different number of changes"):
+        apply_to_figure(root, [("rotate", (), {})], [], {}, keep_svg)
+
+
 def assert_rebuild(layout: Layout, lca_path: LPath, target_layout: Layout, tmp_path: Path) -> None:
+    layout_copy, target_copy = deepcopy(layout), deepcopy(target_layout)
     rebuilt, forward, backward = rebuild(layout, lca_path, target_layout)
     assert rebuilt == target_layout
+    # the inputs are not mutated
+    assert layout == layout_copy
+    assert target_layout == target_copy
 
     rebuilt2, backward2, forward_removed = apply_to_layout(layout, forward)
     assert rebuilt2 == target_layout
@@ -116,3 +202,77 @@ def test_rebuild_merge_lca(lca_root: LayoutNode, tmp_path: Path, define_draw_fun
     assert lca_path == (0,)
 
     assert_rebuild(lca_root, lca_path, mutated_root, tmp_path)
+
+
+def test_rebuild_equal_subtrees(simple_root: LayoutNode) -> None:
+    """Test that structurally equal subtrees produce no steps."""
+    rebuilt, forward, backward = rebuild(simple_root, (), deepcopy(simple_root))
+    assert rebuilt == simple_root
+    assert forward == backward == []
+
+    target = deepcopy(simple_root)
+    target["children"] = (target["children"][0], "f1l")
+    _, forward, _ = rebuild(simple_root, (), target)
+    # only the right subtree is rebuilt
+    assert all(path[0] == 1 for _, path, _ in forward)
+
+
+def test_rebuild_repeated_subtrees(tmp_path: Path, define_draw_funcs: None) -> None:
+    """Test that the steps of a repeated pair of subtrees are replayed correctly."""
+    del define_draw_funcs  # just for the side effect
+
+    def make_half(orient: str, ratios: tuple[int, int], *leafs: str) -> LayoutNode:
+        return {"orient": orient, "children": leafs, "ratios": ratios}  # type: ignore[typeddict-item]
+
+    half = make_half("column", (50, 50), "f1l", "f2l")
+    target_half = make_half("row", (30, 70), "f3l", make_half("column", (50, 50), "f4l", "f5l"))
+    layout: LayoutNode = {"orient": "row", "children": (half, deepcopy(half)), "ratios": (50, 50)}
+    target: LayoutNode = {
+        "orient": "row",
+        "children": (target_half, deepcopy(target_half)),
+        "ratios": (50, 50),
+    }
+
+    _, forward, _ = rebuild(layout, (), target)
+    left = [(key, path[1:], kwargs) for key, path, kwargs in forward if path[0] == 0]
+    right = [(key, path[1:], kwargs) for key, path, kwargs in forward if path[0] == 1]
+    assert left == right
+
+    assert_rebuild(layout, (), target, tmp_path)
+
+
+def test_rebuild_swapped_children(
+    simple_root: LayoutNode, tmp_path: Path, define_draw_funcs: None
+) -> None:
+    """Test that swapped subtrees are swapped in a single step."""
+    del define_draw_funcs  # just for the side effect
+
+    target = deepcopy(simple_root)
+    child1, child2 = target["children"]
+    target["children"] = (child2, child1)
+
+    _, forward, _ = rebuild(simple_root, (), target)
+    assert forward == [("swap", (0,), {"path2": (1,)})]
+
+    assert_rebuild(simple_root, (), target, tmp_path)
+
+
+def test_rebuild_repeated_swapped_children(tmp_path: Path, define_draw_funcs: None) -> None:
+    """Test that a replayed swap of a repeated pair of subtrees swaps at its own path."""
+    del define_draw_funcs  # just for the side effect
+
+    def make_node(orient: str, *children: Layout) -> LayoutNode:
+        return {"orient": orient, "children": children, "ratios": (50, 50)}  # type: ignore[typeddict-item]
+
+    layout = make_node("column", make_node("row", "f1l", "f2l"), make_node("row", "f1l", "f2l"))
+    target = make_node("column", make_node("row", "f2l", "f1l"), make_node("row", "f2l", "f1l"))
+
+    result, forward, _ = rebuild(layout, (), target)
+    assert forward == [
+        ("swap", (0, 0), {"path2": (0, 1)}),
+        ("swap", (1, 0), {"path2": (1, 1)}),
+    ]
+    assert all(isinstance(step, Change) for step in forward)
+    assert are_nodes_equal(result, target)
+
+    assert_rebuild(layout, (), target, tmp_path)
@@ -11,6 +11,7 @@ from mpl_grid_configurator.apply import get_drawer
 from mpl_grid_configurator.figure_editor import FigureEditor
 from mpl_grid_configurator.layout_editor import LayoutEditor
 from mpl_grid_configurator.register import DRAW_FUNCS
+from mpl_grid_configurator.traverse import assert_root
 
 if TYPE_CHECKING:
     from collections.abc import Callable
@@ -127,6 +128,29 @@ def test_delete_to_splitted_root(
         assert removed == expected_removed
 
 
+def test_delete_replace_detach_axes(simple_root: Layout, define_draw_funcs: None) -> None:
+    """Test that removed subfigures leave the figure and cached ones rejoin it."""
+    del define_draw_funcs  # for side effect
+
+    root = render_fig(simple_root)
+    fig = assert_root(root)
+    n_axes = len(fig.axes)
+
+    root, removed = FigureEditor.delete(root, (0, 0))
+    assert removed.axes
+    assert len(fig.axes) == n_axes - len(removed.axes)
+    assert not set(removed.axes) & set(fig.axes)
+
+    # reinsert the removed subfigure from the cache
+    root, replaced, _ = FigureEditor.replace(root, (1, 0), "f1l", removed)
+    assert set(removed.axes) <= set(fig.axes)
+    assert not set(replaced.axes) & set(fig.axes)
+
+    # clearing the figure must not trip over axes of removed subfigures
+    fig.clear()
+    assert not fig.axes
+
+
 def test_replace_unsplitted_root(
     mode: Mode, replace_unsplitted_root: ChangeFixture, tmp_path: Path, define_draw_funcs: None
 ) -> None:
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from mpl_grid_configurator.hashcons import LayoutInterner
+from mpl_grid_configurator.layout_editor import LayoutEditor
+from mpl_grid_configurator.traverse import clone_layout, get_node
+
+if TYPE_CHECKING:
+    from mpl_grid_configurator.types import LayoutNode
+
+
+def test_layout_interner(simple_root: LayoutNode) -> None:
+    interner = LayoutInterner()
+    cloned = clone_layout(simple_root)
+    assert interner.intern(simple_root) == interner.intern(cloned)
+    assert interner.are_equal(get_node(simple_root, (0,)), get_node(cloned, (0,)))
+    assert not interner.are_equal(get_node(simple_root, (0,)), get_node(cloned, (1,)))
+    assert interner.are_equal("f1l", "f1l")
+    assert not interner.are_equal("f1l", simple_root)
+
+    rotated, _ = LayoutEditor.rotate(clone_layout(simple_root), ())
+    assert not interner.are_equal(simple_root, rotated)
+    restructured, _ = LayoutEditor.restructure(clone_layout(simple_root), (1,), (20, 80))
+    assert not interner.are_equal(simple_root, restructured)
@@ -3,10 +3,20 @@ from __future__ import annotations
 import logging
 from typing import TYPE_CHECKING
 
-from mpl_grid_configurator.register import DRAW_FUNCS, register
+from mpl_grid_configurator.register import (
+    DRAW_FUNCS,
+    get_func_names,
+    get_func_names_json,
+    get_revision,
+    invalidate_registry,
+    register,
+)
 from mpl_grid_configurator.render import DEFAULT_DRAW_FUNC, DEFAULT_LEAF
+from mpl_grid_configurator.types import get_draw_func_kind
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     import pytest
 
 
@@ -55,3 +65,73 @@ def test_register(reset_draw_funcs: None, caplog: pytest.LogCaptureFixture) -> N
         "draw_svg_2": draw_svg_another_copy,
     }
     assert DRAW_FUNCS == expected  # noqa: SIM300
+
+
+def test_register_same_name(reset_draw_funcs: None) -> None:
+    del reset_draw_funcs
+
+    def make_draw_func() -> Callable[[], str]:
+        def draw_many() -> str:
+            return ""
+
+        return draw_many
+
+    funcs = [make_draw_func() for _ in range(4)]
+    for func in funcs:
+        register(func)
+    assert list(DRAW_FUNCS) == ["draw_many", "draw_many_1", "draw_many_2", "draw_many_3"]
+
+    # numbering restarts once the base name is free again
+    DRAW_FUNCS.clear()
+    register(funcs[0])
+    assert list(DRAW_FUNCS) == ["draw_many"]
+
+
+class UnhashableDraw:
+    """Callable drawing function which can not be hashed."""
+
+    __name__ = "draw_unhashable"
+    __hash__ = None  # type: ignore[assignment]
+
+    def __call__(self) -> str:
+        """Draw nothing."""
+        return ""
+
+
+def draw_unresolved() -> UndefinedType:  # type: ignore[name-defined] # noqa: F821
+    return ""
+
+
+def test_register_uninspectable(reset_draw_funcs: None) -> None:
+    """Test that functions which can not be cached or inspected on registration are accepted."""
+    del reset_draw_funcs
+
+    unhashable = UnhashableDraw()
+    register(unhashable)
+    register(unhashable)
+    register(draw_unresolved)
+    assert list(DRAW_FUNCS) == ["draw_unhashable", "draw_unresolved"]
+
+    # the variant of unhashable functions is inspected on every call instead
+    assert get_draw_func_kind(unhashable) == "str"
+
+
+def test_get_func_names(reset_draw_funcs: None) -> None:
+    del reset_draw_funcs
+
+    assert get_func_names() == ()
+    revision = get_revision()
+    names = get_func_names()
+    assert get_func_names() is names
+
+    def draw_cached() -> str:
+        return ""
+
+    register(draw_cached)
+    assert get_revision() > revision
+    assert get_func_names() == ("draw_cached",)
+    assert get_func_names_json() == b'["draw_cached"]'
+
+    DRAW_FUNCS.clear()
+    invalidate_registry()
+    assert get_func_names() == ()
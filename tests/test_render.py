@@ -4,13 +4,30 @@ import re
 from typing import TYPE_CHECKING
 
 from matplotlib.figure import Figure, SubFigure
-from utils import assert_files_equal
-
-from mpl_grid_configurator.render import draw_empty, new_root, render_svg, savefig, split_figure
+from utils import assert_figure_equals_layout, assert_files_equal
+
+from mpl_grid_configurator.figure_editor import FigureEditor
+from mpl_grid_configurator.register import DRAW_FUNCS, register
+from mpl_grid_configurator.render import (
+    SVG_METADATA,
+    DrawStep,
+    SplitStep,
+    compile_layout,
+    draw_empty,
+    new_root,
+    prefetch_svgs,
+    render_layout,
+    render_svg,
+    savefig,
+    split_figure,
+)
+from mpl_grid_configurator.traverse import assert_root
 
 if TYPE_CHECKING:
     from pathlib import Path
 
+    from mpl_grid_configurator.types import LayoutNode
+
 
 def test_new_root() -> None:
     fig, root = new_root()
@@ -47,9 +64,66 @@ def test_split_figure_column() -> None:
     assert gs.get_height_ratios() == (50, 50)
 
 
+def test_compile_layout(simple_left: LayoutNode) -> None:
+    assert compile_layout(simple_left) == (
+        SplitStep(0, "column", (30, 70)),
+        DrawStep(1, "f1l"),
+        SplitStep(2, "column", (30, 70)),
+        DrawStep(3, "f2l"),
+        DrawStep(4, "f6l"),
+    )
+    assert compile_layout("f1l") == (DrawStep(0, "f1l"),)
+
+
 # TODO(tihoph): run_draw_func
 # TODO(tihoph): render_recursive
-# TODO(tihoph): render_layout
+
+
+def test_prefetch_svgs(reset_draw_funcs: None) -> None:
+    del reset_draw_funcs  # just for side effect
+
+    def draw_svg1() -> str:
+        return "svg1"
+
+    def draw_svg2() -> str:
+        return "svg2"
+
+    register(draw_empty)
+    register(draw_svg1)
+    register(draw_svg2)
+
+    layout: LayoutNode = {
+        "orient": "row",
+        "children": (
+            "draw_svg1",
+            {"orient": "column", "children": ("draw_empty", "draw_svg2"), "ratios": (50, 50)},
+        ),
+        "ratios": (50, 50),
+    }
+    assert prefetch_svgs(layout, DRAW_FUNCS) == {"draw_svg1": "svg1", "draw_svg2": "svg2"}
+    # a single svg function is not worth a thread pool
+    assert prefetch_svgs("draw_svg1", DRAW_FUNCS) == {}
+
+
+def test_render_layout_reuse_figure(
+    simple_root: LayoutNode, tmp_path: Path, define_draw_funcs: None
+) -> None:
+    del define_draw_funcs  # just for side effect
+
+    root, _ = render_layout("f1l", (4, 4), DRAW_FUNCS)
+    fig = assert_root(root)
+
+    reused, _ = render_layout(simple_root, (8, 8), DRAW_FUNCS, fig)
+    assert assert_root(reused) is fig
+    assert_figure_equals_layout(reused, simple_root, tmp_path)
+    n_axes = len(fig.axes)
+
+    # the axes of deleted subfigures are no longer tracked by the figure
+    FigureEditor.delete(reused, (0, 1))
+    assert len(fig.axes) < n_axes
+    reused, _ = render_layout(simple_root, (8, 8), DRAW_FUNCS, fig)
+    assert assert_root(reused) is fig
+    assert len(fig.axes) == n_axes
 
 
 def test_render_svg(tmp_path: Path) -> None:
@@ -57,15 +131,14 @@ def test_render_svg(tmp_path: Path) -> None:
     fig.patch.set_visible(False)
     fig.add_subplot()
 
-    fig.savefig(tmp_path / "fig.svg")
+    fig.savefig(tmp_path / "fig.svg", metadata=SVG_METADATA)
     expected = (tmp_path / "fig.svg").read_text()
+    assert "<metadata>" not in expected
 
     # replace all xlink:href="#...." with xlink:href="#"
-    # replace <dc:date> ... </dc:date> with ""
     def clean_references(svg: str) -> str:
         svg = re.sub(r'xlink:href="#\w+"', 'xlink:href="#"', svg)
-        svg = re.sub(r'path id="\w+"', 'path id="#"', svg)
-        return re.sub(r"<dc:date>.*?</dc:date>", "", svg)
+        return re.sub(r'path id="\w+"', 'path id="#"', svg)
 
     assert render_svg(fig, clean_references) == clean_references(expected)
 
@@ -12,8 +12,12 @@ from mpl_grid_configurator.traverse import (
     adjust_node_id,
     almost_equal,
     are_nodes_equal,
+    are_ratios_equal,
     assert_node,
     assert_root,
+    build_id_path_map,
+    clone_layout,
+    copy_path,
     find_path_by_id,
     get_at,
     get_lca,
@@ -22,6 +26,7 @@ from mpl_grid_configurator.traverse import (
     get_node,
     get_subfig,
     is_root,
+    iter_leafs,
     set_node,
 )
 
@@ -74,6 +79,12 @@ def test_almost_equal() -> None:
     assert not almost_equal(0.2 * 7, 1.41)
 
 
+def test_are_ratios_equal() -> None:
+    assert are_ratios_equal((50, 50), (50, 50))
+    assert are_ratios_equal((30, 70), (0.3, 0.7))
+    assert not are_ratios_equal((30, 70), (70, 30))
+
+
 @pytest.mark.parametrize("path", [(0,), (0, 0), (0, 1), (1,)])
 def test_get_subfig(path: LPath, nested_subfigures: tuple[Figure, dict[LPath, SubFigure]]) -> None:
     fig, subfigures_mapping = nested_subfigures
@@ -209,6 +220,13 @@ def test_set_node_root_fail() -> None:
         set_node("root", (1,), "new_root")
 
 
+def test_iter_leafs(simple_root: LayoutNode, simple_root_leafs: dict[LPath, str]) -> None:
+    assert list(iter_leafs(simple_root)) == [
+        simple_root_leafs[p] for p in sorted(simple_root_leafs)
+    ]
+    assert list(iter_leafs("f1l")) == ["f1l"]
+
+
 def test_get_lca_path(
     lca_request: tuple[LPath, LPath, LPath],
 ) -> None:
@@ -269,7 +287,51 @@ def test_assert_root_fail(sf: SubFigure_) -> None:
         assert_root(sf)
 
 
-# TODO(tihoph): test_are_nodes_equal
+def test_are_nodes_equal(simple_root: LayoutNode) -> None:
+    assert are_nodes_equal(simple_root, simple_root)
+    assert are_nodes_equal(simple_root, deepcopy(simple_root))
+    assert are_nodes_equal("f1l", "f1l")
+    assert not are_nodes_equal("f1l", "f2l")
+    assert not are_nodes_equal(simple_root, "f1l")
+
+    almost = deepcopy(simple_root)
+    almost["ratios"] = (almost["ratios"][0] + 1e-12, almost["ratios"][1] - 1e-12)
+    assert are_nodes_equal(simple_root, almost)
+
+    copied = copy_path(simple_root, (1, 1))
+    assert are_nodes_equal(simple_root, copied)
+    set_node(copied, (1, 1, 0), "f7")
+    assert not are_nodes_equal(simple_root, copied)
+
+    rotated = deepcopy(simple_root)
+    get_node(rotated, (0, 1))["orient"] = "row"
+    assert not are_nodes_equal(simple_root, rotated)
+
+
+def test_clone_layout(simple_root: LayoutNode) -> None:
+    cloned = clone_layout(simple_root)
+    assert cloned == simple_root
+    assert cloned is not simple_root
+    assert get_node(cloned, (0,)) is not get_node(simple_root, (0,))
+
+    cloned["orient"] = "column" if cloned["orient"] == "row" else "row"
+    assert cloned != simple_root
+    assert clone_layout("f1l") == "f1l"
+
+
+def test_copy_path(simple_root: LayoutNode) -> None:
+    original = deepcopy(simple_root)
+    copied = copy_path(simple_root, (0, 1, 0))
+    assert copied == simple_root
+    for path in ((), (0,), (0, 1)):
+        assert get_node(copied, path) is not get_node(simple_root, path)
+    # siblings are shared
+    assert get_node(copied, (1,)) is get_node(simple_root, (1,))
+
+    set_node(copied, (0, 1, 0), "f7")
+    assert get_at(copied, (0, 1, 0)) == "f7"
+    assert simple_root == original
+    assert copy_path("f1l", ()) == "f1l"
 
 
 def get_node_id_mapping(node: LayoutNode) -> dict[str, str]:
@@ -313,3 +375,12 @@ def test_find_path_by_id(simple_left: LayoutNode, use_full_id: bool) -> None:
         found_path = find_path_by_id(simple_left, used_id, use_full_id=use_full_id)
         assert found_path is not None
         assert get_leaf(simple_left, found_path) == full_id
+
+
+@pytest.mark.parametrize("use_full_id", [False, True])
+def test_build_id_path_map(simple_left: LayoutNode, use_full_id: bool) -> None:
+    simple_left = adjust_node_id(simple_left, mode="add")
+    id_paths = build_id_path_map(simple_left, use_full_id=use_full_id)
+    assert len(id_paths) == len(list(iter_leafs(simple_left)))
+    for used_id, path in id_paths.items():
+        assert find_path_by_id(simple_left, used_id, use_full_id=use_full_id) == path
@@ -7,6 +7,7 @@ from matplotlib.axes import Axes
 
 from mpl_grid_configurator.types import (
     Edge,
+    get_draw_func_kind,
     get_n_params,
     get_return_type,
     is_str_draw_func,
@@ -16,7 +17,7 @@ from mpl_grid_configurator.types import (
 if TYPE_CHECKING:
     from matplotlib.figure import Figure, SubFigure
 
-    from mpl_grid_configurator.types import DrawFunc
+    from mpl_grid_configurator.types import DrawFunc, DrawFuncKind
 
 
 def tuple_draw_func(fig: Figure | SubFigure) -> tuple[Axes, str]:
@@ -67,6 +68,18 @@ def test_is_str_draw_func(func: DrawFunc, expected: bool) -> None:
     assert is_str_draw_func(func) == expected
 
 
+@pytest.mark.parametrize(
+    ("func", "expected"),
+    [
+        (tuple_draw_func, "tuple"),
+        (axes_draw_func, "axes"),
+        (str_draw_func, "str"),
+    ],
+)
+def test_get_draw_func_kind(func: DrawFunc, expected: DrawFuncKind) -> None:
+    assert get_draw_func_kind(func) == expected
+
+
 @pytest.mark.parametrize(
     ("func", "expected"),
     [